@@ -1,6 +1,8 @@
 """Feature processing utilities."""
 import pandas as pd
 import numpy as np
+import math
+import threading
 import sys
 import os
 
@@ -15,111 +17,217 @@ else:
 
 CURRENT_YEAR = 2025
 
+# Boolean features - each field owns a fixed bit in the packed boolean mask
+BOOLEAN_FIELDS = (
+    'air_bag', 'ar_condicionado', 'alarme', 'controle_automatico_de_velocidade',
+    'trava_eletrica', 'vidro_eletrico', 'ipva_pago', 'pneus_novos',
+    'sensor_de_re', 'historico_veicular', 'aceita_trocas', 'garantia_de_3_meses',
+    'laudo_veicular', 'camera_de_re', 'com_manual', 'com_garantia',
+    'entrega_do_veiculo', 'computador_de_bordo', 'transferencia_de_documentacao',
+    'carro_de_leilao', 'rodas_de_liga_leve', 'unico_dono', 'conexao_usb',
+    'bancos_de_couro', 'interface_bluetooth', 'higienizacao_do_veiculo',
+    'tracao_4x4', 'tanque_cheio', 'laudo_cautelar', 'chave_reserva', 'som',
+    'com_multas', 'primeira_revisao_gratis', 'blindado', 'navegador_gps',
+    'revisoes_feitas_em_concessionaria', 'ipva_gratis', 'apoio_na_documentacao',
+    'teto_solar', 'veiculo_em_financiamento', 'garantia_3_meses', 'veiculo_quitado',
+    'financiado', 'garantia_do_motor', 'volante_multifuncional',
+    'com_garantia_de_fabrica', 'com_chave_reserva'
+)
+
+# Numeric and categorical features, in the order their builders return them
+NUMERIC_FEATURES = (
+    'car_age', 'km_per_year', 'motor_clean', 'quilometragem_clean',
+    'final_de_placa', 'portas_clean', 'potencia_clean'
+)
+CATEGORICAL_FEATURES = (
+    'marca', 'state_clean', 'câmbio', 'combustível', 'direção', 'cor',
+    'tipo_de_veículo', 'tipo_de_direção', 'possui_kit_gnv'
+)
+
+def derive_age_and_mileage(ano: float, quilometragem) -> tuple:
+    """Compute (car_age, km_per_year, quilometragem) for one car with plain float math."""
+    car_age = CURRENT_YEAR - ano
+    if car_age <= 0:
+        car_age = 0.5
+    
+    # Missing or NaN mileage counts as zero
+    if quilometragem is None or quilometragem != quilometragem:
+        quilometragem = 0.0
+    km_per_year = quilometragem / car_age
+    if not math.isfinite(km_per_year):
+        km_per_year = 0.0
+    
+    return car_age, km_per_year, quilometragem
+
+def derive_age_and_mileage_batch(ano: np.ndarray, quilometragem: np.ndarray) -> tuple:
+    """Array version of derive_age_and_mileage over many cars (missing mileage as NaN)."""
+    car_age = CURRENT_YEAR - ano
+    car_age[car_age <= 0] = 0.5
+    
+    quilometragem = np.where(np.isnan(quilometragem), 0.0, quilometragem)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        km_per_year = quilometragem / car_age
+    km_per_year[~np.isfinite(km_per_year)] = 0.0
+    
+    return car_age, km_per_year, quilometragem
+
 class FeatureProcessor:
     """Processes car features for model prediction."""
     
     def __init__(self, model_loader: ModelLoader):
         self.model_loader = model_loader
-    
-    def calculate_derived_features(self, car: CarFeatures) -> dict:
-        """Calculate derived features like car_age and km_per_year."""
-        car_age = CURRENT_YEAR - car.ano
-        if car_age <= 0:
-            car_age = 0.5
         
-        quilometragem = car.quilometragem if car.quilometragem is not None else 0
-        km_per_year = quilometragem / car_age if car_age > 0 else 0
-        if not np.isfinite(km_per_year):
-            km_per_year = 0
+        # Typed scatter tables: (source slot, feature row position) pairs per
+        # feature group. Numeric values only land in numeric/bool columns and
+        # categorical values only in object columns.
+        col_index = model_loader.get_column_index() or {}
+        record_dtype = model_loader.get_record_dtype()
+        self._numeric_slots, self._numeric_idx = self._scatter_table(
+            NUMERIC_FEATURES, col_index, lambda col: record_dtype[col].kind != 'O'
+        )
+        self._categorical_slots, self._categorical_idx = self._scatter_table(
+            CATEGORICAL_FEATURES, col_index, lambda col: record_dtype[col].kind == 'O'
+        )
+        self._bool_bits, self._bool_idx = self._scatter_table(BOOLEAN_FIELDS, col_index)
         
-        return {
-            'car_age': car_age,
-            'km_per_year': km_per_year,
-            'quilometragem_clean': quilometragem
-        }
+        # Single-row buffers reused by every prepare_features call. The lock
+        # serializes writers; the returned DataFrame owns a copy of the data.
+        self._defaults = model_loader.new_feature_row()
+        self._row = model_loader.new_feature_row()
+        self._record = np.empty(1, dtype=record_dtype) if record_dtype is not None else None
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _scatter_table(fields, col_index: dict, accepts=None) -> tuple:
+        """Positions of `fields` (slots) and of their target columns in the feature row."""
+        pairs = [
+            (slot, col_index[field]) for slot, field in enumerate(fields)
+            if field in col_index and (accepts is None or accepts(field))
+        ]
+        slots = np.array([slot for slot, _ in pairs], dtype=np.intp)
+        idx = np.array([i for _, i in pairs], dtype=np.intp)
+        return slots, idx
+    
+    def build_boolean_mask(self, car: CarFeatures) -> int:
+        """Pack the boolean features of a car into a single integer bitmask."""
+        mask = 0
+        for bit, field in enumerate(BOOLEAN_FIELDS):
+            if getattr(car, field, False):
+                mask |= 1 << bit
+        return mask
+    
+    def unpack_boolean_mask(self, mask) -> np.ndarray:
+        """Unpack boolean bitmask(s) into one bool per BOOLEAN_FIELDS entry along the last axis."""
+        masks = np.asarray(mask, dtype='<u8')
+        bits = np.unpackbits(masks[..., None].view(np.uint8), axis=-1, bitorder='little')
+        return bits[..., :len(BOOLEAN_FIELDS)].astype(bool)
+    
+    def build_numeric_features(self, car: CarFeatures) -> list:
+        """Build numeric features in NUMERIC_FEATURES order."""
+        car_age, km_per_year, quilometragem = derive_age_and_mileage(car.ano, car.quilometragem)
+        return [
+            car_age, km_per_year, car.motor, quilometragem,
+            car.final_de_placa, car.portas, car.potencia
+        ]
+    
+    def build_numeric_features_batch(self, cars: list) -> np.ndarray:
+        """Build an (n_cars, len(NUMERIC_FEATURES)) float matrix."""
+        raw = np.array(
+            [(car.ano, car.quilometragem, car.motor, car.final_de_placa, car.portas, car.potencia) for car in cars],
+            dtype=np.float64
+        ).reshape(len(cars), 6)
+        car_age, km_per_year, quilometragem = derive_age_and_mileage_batch(raw[:, 0], raw[:, 1])
+        return np.column_stack([
+            car_age, km_per_year, raw[:, 2], quilometragem,
+            raw[:, 3], raw[:, 4], raw[:, 5]
+        ])
+    
+    def build_categorical_features(self, car: CarFeatures) -> list:
+        """Build categorical features, with mappings, in CATEGORICAL_FEATURES order."""
+        return [
+            self.model_loader.get_brand_mapping(car.marca),
+            self.model_loader.get_state_mapping(car.state),
+            car.cambio, car.combustivel, car.direcao, car.cor,
+            car.tipo_de_veiculo, car.tipo_de_direcao, car.possui_kit_gnv
+        ]
     
     def build_features_dict(self, car: CarFeatures) -> dict:
-        """Build complete features dictionary from car input."""
-        derived = self.calculate_derived_features(car)
+        """Build numeric and categorical features dictionary from car input."""
+        features = dict(zip(NUMERIC_FEATURES, self.build_numeric_features(car)))
+        features.update(zip(CATEGORICAL_FEATURES, self.build_categorical_features(car)))
+        return features
+    
+    def prepare_records(self, car: CarFeatures):
+        """Prepare the feature row of a car as a one-element structured array.
         
-        # Numeric features
-        features = {
-            'car_age': derived['car_age'],
-            'km_per_year': derived['km_per_year'],
-            'motor_clean': car.motor,
-            'quilometragem_clean': derived['quilometragem_clean'],
-            'final_de_placa': car.final_de_placa,
-            'portas_clean': car.portas,
-            'potencia_clean': car.potencia,
-        }
+        Returns None when no training column metadata is loaded.
+        """
+        if self._row is None:
+            return None
         
-        # Categorical features with mappings
-        features.update({
-            'marca': self.model_loader.get_brand_mapping(car.marca),
-            'state_clean': self.model_loader.get_state_mapping(car.state),
-            'câmbio': car.cambio,
-            'combustível': car.combustivel,
-            'direção': car.direcao,
-            'cor': car.cor,
-            'tipo_de_veículo': car.tipo_de_veiculo,
-            'tipo_de_direção': car.tipo_de_direcao,
-            'possui_kit_gnv': car.possui_kit_gnv,
-        })
+        bools = self.unpack_boolean_mask(self.build_boolean_mask(car))
+        # CarFeatures already maps missing numerics to zero
+        numeric = np.array(self.build_numeric_features(car), dtype=np.float64)
+        categorical = np.array(self.build_categorical_features(car), dtype=object)
         
-        # Boolean features - get all boolean fields from CarFeatures
-        boolean_fields = [
-            'air_bag', 'ar_condicionado', 'alarme', 'controle_automatico_de_velocidade',
-            'trava_eletrica', 'vidro_eletrico', 'ipva_pago', 'pneus_novos',
-            'sensor_de_re', 'historico_veicular', 'aceita_trocas', 'garantia_de_3_meses',
-            'laudo_veicular', 'camera_de_re', 'com_manual', 'com_garantia',
-            'entrega_do_veiculo', 'computador_de_bordo', 'transferencia_de_documentacao',
-            'carro_de_leilao', 'rodas_de_liga_leve', 'unico_dono', 'conexao_usb',
-            'bancos_de_couro', 'interface_bluetooth', 'higienizacao_do_veiculo',
-            'tracao_4x4', 'tanque_cheio', 'laudo_cautelar', 'chave_reserva', 'som',
-            'com_multas', 'primeira_revisao_gratis', 'blindado', 'navegador_gps',
-            'revisoes_feitas_em_concessionaria', 'ipva_gratis', 'apoio_na_documentacao',
-            'teto_solar', 'veiculo_em_financiamento', 'garantia_3_meses', 'veiculo_quitado',
-            'financiado', 'garantia_do_motor', 'volante_multifuncional',
-            'com_garantia_de_fabrica', 'com_chave_reserva'
-        ]
+        with self._lock:
+            # Scatter each feature group into the row by column position
+            row = self._row
+            row[:] = self._defaults
+            row[self._numeric_idx] = numeric[self._numeric_slots]
+            row[self._categorical_idx] = categorical[self._categorical_slots]
+            row[self._bool_idx] = bools[self._bool_bits]
+            
+            # A single typed record carries training dtypes, so no per-column coercion runs
+            self._record[0] = tuple(row)
+            return self._record.copy()
+    
+    def prepare_records_batch(self, cars: list):
+        """Prepare the feature rows of a batch of cars as a structured array.
         
-        for field in boolean_fields:
-            features[field] = getattr(car, field, False)
+        Returns None when no training column metadata is loaded.
+        """
+        defaults = self._defaults
+        if defaults is None:
+            return None
         
-        return features
+        bools = self.unpack_boolean_mask([self.build_boolean_mask(car) for car in cars])
+        # Numeric features are derived column-wise for the whole batch at once
+        numeric = self.build_numeric_features_batch(cars)
+        categorical = np.array(
+            [self.build_categorical_features(car) for car in cars], dtype=object
+        ).reshape(len(cars), len(CATEGORICAL_FEATURES))
+        
+        # Start every row from the column defaults, then fill column by column
+        record_dtype = self.model_loader.get_record_dtype()
+        records = np.empty(len(cars), dtype=record_dtype)
+        records[:] = tuple(defaults)
+        for values, slots, idxs in (
+            (numeric, self._numeric_slots, self._numeric_idx),
+            (categorical, self._categorical_slots, self._categorical_idx),
+            (bools, self._bool_bits, self._bool_idx),
+        ):
+            for slot, idx in zip(slots, idxs):
+                records[record_dtype.names[idx]] = values[:, slot]
+        return records
     
     def prepare_features(self, car: CarFeatures) -> pd.DataFrame:
         """Prepare features DataFrame for model prediction."""
-        features_dict = self.build_features_dict(car)
-        df = pd.DataFrame([features_dict])
-        
-        # Get expected columns
-        expected_cols = self.model_loader.get_expected_columns()
-        if expected_cols is None:
+        records = self.prepare_records(car)
+        if records is None:
+            # Fallback: use columns from features_dict
+            features_dict = self.build_features_dict(car)
+            bools = self.unpack_boolean_mask(self.build_boolean_mask(car))
+            features_dict.update(zip(BOOLEAN_FIELDS, bools.tolist()))
+            return pd.DataFrame([features_dict])
+        return self.model_loader.records_to_frame(records)
+    
+    def prepare_features_batch(self, cars: list) -> pd.DataFrame:
+        """Prepare features DataFrame for a batch of cars, one row per car."""
+        records = self.prepare_records_batch(cars)
+        if records is None:
             # Fallback: use columns from features_dict
+            df = pd.DataFrame([self.build_features_dict(car) for car in cars])
+            df[list(BOOLEAN_FIELDS)] = self.unpack_boolean_mask([self.build_boolean_mask(car) for car in cars])
             return df
-        
-        # Ensure all expected columns exist with correct types
-        for col in expected_cols:
-            if col not in df.columns:
-                dtype = self.model_loader.get_column_dtype(col)
-                if dtype and 'bool' in str(dtype):
-                    df[col] = False
-                elif dtype and ('float' in str(dtype) or 'int' in str(dtype)):
-                    df[col] = 0.0
-                else:
-                    df[col] = None
-            else:
-                # Ensure type matches training data
-                dtype = self.model_loader.get_column_dtype(col)
-                if dtype:
-                    if 'bool' in str(dtype):
-                        df[col] = df[col].astype(bool)
-                    elif 'int' in str(dtype):
-                        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype('int64')
-                    elif 'float' in str(dtype):
-                        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0.0).astype('float64')
-        
-        # Return DataFrame with all expected columns in the correct order
-        return df[expected_cols]
-
+        return self.model_loader.records_to_frame(records)
@@ -1,7 +1,10 @@
 """FastAPI application for used car price prediction."""
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import TypeAdapter, ValidationError
 from contextlib import asynccontextmanager
 import numpy as np
+import math
 import sys
 import os
 
@@ -9,12 +12,12 @@ import os
 if __name__ == "__main__":
     # When running directly, add parent directory to path
     sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    from api.models import CarFeatures
+    from api.models import CarFeatures, PricePrediction, BatchPricePrediction
     from api.model_loader import ModelLoader
     from api.feature_processor import FeatureProcessor
 else:
     # When running as module, use relative imports
-    from .models import CarFeatures
+    from .models import CarFeatures, PricePrediction, BatchPricePrediction
     from .model_loader import ModelLoader
     from .feature_processor import FeatureProcessor
 
@@ -22,6 +25,14 @@ else:
 model_loader = ModelLoader()
 feature_processor = None
 
+def predict_log_price(car: CarFeatures) -> float:
+    """Run feature preparation and the model for a single car (returns log_price)."""
+    # Typed records go straight into the model input matrix without a DataFrame
+    features = feature_processor.prepare_records(car)
+    if features is None:
+        features = feature_processor.prepare_features(car)
+    return model_loader.predict(features)[0]
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan context manager for startup and shutdown events."""
@@ -29,6 +40,12 @@ async def lifespan(app: FastAPI):
     global feature_processor
     model_loader.load()
     feature_processor = FeatureProcessor(model_loader)
+    
+    # Warm up the prediction path so the first request doesn't pay first-call costs
+    try:
+        predict_log_price(CarFeatures(ano=2020, marca='Chevrolet', state='SP'))
+    except Exception as e:
+        print(f"Warm-up prediction failed: {e}")
     yield
     # Shutdown (if needed in the future)
 
@@ -43,13 +60,44 @@ async def root():
     """Health check endpoint."""
     return {"message": "Used Car Price Predictor API", "version": "1.0.0"}
 
-@app.post("/predict")
-async def predict(car: CarFeatures):
+# Request bodies are parsed by the handlers themselves, so their schemas are
+# published to OpenAPI explicitly
+CAR_FEATURES_SCHEMA = CarFeatures.model_json_schema()
+CAR_FEATURES_BODY = {
+    "requestBody": {
+        "content": {"application/json": {"schema": CAR_FEATURES_SCHEMA}},
+        "required": True,
+    }
+}
+CAR_FEATURES_BATCH_BODY = {
+    "requestBody": {
+        "content": {"application/json": {"schema": {"type": "array", "items": CAR_FEATURES_SCHEMA}}},
+        "required": True,
+    }
+}
+
+CAR_ADAPTER = TypeAdapter(CarFeatures)
+CAR_BATCH_ADAPTER = TypeAdapter(list[CarFeatures])
+
+async def parse_body(request: Request, adapter: TypeAdapter):
+    """Parse and validate the raw request body in a single pass."""
+    try:
+        return adapter.validate_json(await request.body())
+    except ValidationError as e:
+        # Keep FastAPI's error layout, which locates body fields under 'body'
+        raise RequestValidationError(
+            [{**error, 'loc': ('body', *error['loc'])} for error in e.errors(include_url=False)]
+        )
+
+@app.post("/predict", openapi_extra=CAR_FEATURES_BODY)
+async def predict(request: Request) -> PricePrediction:
     """
     Predict the price of a used car based on its features.
     
     Returns the predicted price in the original scale (not log-transformed).
     """
+    car = await parse_body(request, CAR_ADAPTER)
+    
     model = model_loader.get_model()
     if model is None:
         raise HTTPException(status_code=500, detail="Model not loaded")
@@ -58,19 +106,58 @@ async def predict(car: CarFeatures):
         raise HTTPException(status_code=500, detail="Feature processor not initialized")
     
     try:
-        # Prepare features
-        features_df = feature_processor.prepare_features(car)
-        
-        # Make prediction (model returns log_price)
-        log_price_pred = model.predict(features_df)[0]
+        # Prepare features and make prediction (model returns log_price)
+        log_price_pred = predict_log_price(car)
         
-        # Convert from log scale to actual price
-        price_pred = np.expm1(log_price_pred)
+        # Convert from log scale to actual price; a scalar needs no ufunc dispatch
+        log_price_pred = float(log_price_pred)
+        price_pred = math.expm1(log_price_pred)
         
         return {
-            "predicted_price": float(price_pred),
-            "predicted_price_log": float(log_price_pred),
+            "predicted_price": price_pred,
+            "predicted_price_log": log_price_pred,
             "currency": "BRL"
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
+
+@app.post("/predict_batch", openapi_extra=CAR_FEATURES_BATCH_BODY)
+async def predict_batch(request: Request) -> BatchPricePrediction:
+    """
+    Predict the prices of many used cars in a single model call.
+    
+    Returns one prediction per input car, in the same order.
+    """
+    cars = await parse_body(request, CAR_BATCH_ADAPTER)
+    
+    model = model_loader.get_model()
+    if model is None:
+        raise HTTPException(status_code=500, detail="Model not loaded")
+    
+    if feature_processor is None:
+        raise HTTPException(status_code=500, detail="Feature processor not initialized")
+    
+    if not cars:
+        return {"predictions": []}
+    
+    try:
+        # Prepare all rows at once and make a single prediction call
+        features = feature_processor.prepare_records_batch(cars)
+        if features is None:
+            features = feature_processor.prepare_features_batch(cars)
+        # Same float64 conversion as the single-car endpoint
+        log_price_preds = model_loader.predict(features).astype(np.float64)
+        price_preds = np.expm1(log_price_preds)
+        
+        return {
+            "predictions": [
+                {
+                    "predicted_price": float(price_pred),
+                    "predicted_price_log": float(log_price_pred),
+                    "currency": "BRL"
+                }
+                for price_pred, log_price_pred in zip(price_preds, log_price_preds)
+            ]
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
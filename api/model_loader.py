@@ -3,16 +3,28 @@ import pandas as pd
 import numpy as np
 import joblib
 import os
+from sklearn.compose import ColumnTransformer
+from sklearn.impute import SimpleImputer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import FunctionTransformer, OneHotEncoder
 
 class ModelLoader:
     """Handles model loading and data mappings."""
     
     def __init__(self):
         self.model = None
+        self._predict_fn = None
         self.training_data = None
         self.top_20_brands = None
         self.rare_states = None
+        self._brand_map = {}
+        self._state_map = {}
         self.expected_columns = None
+        self._dtypes = {}
+        self._col_index = None
+        self._record_dtype = None
+        self._defaults = None
+        self._categories = {}
     
     def load(self):
         """Load model and prepare mappings."""
@@ -23,34 +35,55 @@ class ModelLoader:
         model_path = os.path.join(project_root, 'models', 'price_predictor_v1.pkl')
         if not os.path.exists(model_path):
             raise FileNotFoundError(f"Model file not found at {model_path}")
-        self.model = joblib.load(model_path)
+        # Array data is memory-mapped read-only, so worker processes share the
+        # page cache instead of each holding a private copy. The model must not
+        # be modified in place (it also requires an uncompressed pickle).
+        self.model = joblib.load(model_path, mmap_mode='r')
         
         # Load training data for mappings
-        data_path = os.path.join(project_root, 'data', 'processed', 'olx_cars_cleaned.csv')
+        data_path = os.path.join(project_root, 'data', 'processed', 'olx_cars_cleaned.parquet')
         if os.path.exists(data_path):
-            self.training_data = pd.read_csv(data_path)
+            self.training_data = pd.read_parquet(data_path, engine='pyarrow')
             
             # Apply feature engineering (same as in train.py)
             CURRENT_YEAR = 2025
             self.training_data['log_price'] = np.log1p(self.training_data['price_clean'])
-            self.training_data['car_age'] = CURRENT_YEAR - self.training_data['ano_limpo']
-            self.training_data.loc[self.training_data['car_age'] <= 0, 'car_age'] = 0.5
-            self.training_data['quilometragem_clean'] = self.training_data['quilometragem_clean'].fillna(0)
-            self.training_data['km_per_year'] = self.training_data['quilometragem_clean'] / self.training_data['car_age']
-            self.training_data['km_per_year'] = self.training_data['km_per_year'].replace([np.inf, -np.inf], np.nan).fillna(0)
+            age = CURRENT_YEAR - self.training_data['ano_limpo'].to_numpy(dtype=np.float64)
+            self.training_data['car_age'] = car_age = np.where(age <= 0, 0.5, age)
+            
+            # Missing mileage counts as zero; filled on the array the ratio reads
+            km = self.training_data['quilometragem_clean'].to_numpy(dtype=np.float64)
+            self.training_data['quilometragem_clean'] = km = np.where(np.isnan(km), 0.0, km)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                km_per_year = km / car_age
+            self.training_data['km_per_year'] = np.where(np.isfinite(km_per_year), km_per_year, 0.0)
             
             # Apply state mapping
-            state_counts = self.training_data['state_clean'].value_counts()
-            rare_states = state_counts[state_counts < 50].index
-            self.training_data['state_clean'] = self.training_data['state_clean'].replace(rare_states, 'STATE_OTHER')
+            # Counts only need a hash pass; no ordering is required for a threshold
+            state_counts = self.training_data['state_clean'].value_counts(sort=False)
+            rare_states = state_counts.index[state_counts.to_numpy() < 50]
+            # np.where rather than mask/where: the categoricals read from
+            # Parquet cannot take the new bucket label in place
+            self.training_data['state_clean'] = np.where(
+                self.training_data['state_clean'].isin(rare_states), 'STATE_OTHER',
+                self.training_data['state_clean']
+            )
             self.rare_states = set(rare_states)
             
             # Apply brand mapping
-            brand_counts = self.training_data['marca'].value_counts()
-            top_20_brands = brand_counts.head(20).index
-            self.training_data['marca'] = self.training_data['marca'].apply(lambda x: x if x in top_20_brands else 'BRAND_OTHER')
+            # Partial selection of the 20 largest counts instead of sorting all of
+            # them; keep='first' breaks ties like value_counts().head(20) in training
+            brand_counts = self.training_data['marca'].value_counts(sort=False)
+            top_20_brands = brand_counts.nlargest(20, keep='first').index
+            self.training_data['marca'] = np.where(
+                self.training_data['marca'].isin(top_20_brands), self.training_data['marca'], 'BRAND_OTHER'
+            )
             self.top_20_brands = set(top_20_brands)
             
+            # Lookup tables for the per-request brand/state mappings
+            self._brand_map = {brand: brand for brand in self.top_20_brands}
+            self._state_map = {state: 'STATE_OTHER' for state in self.rare_states}
+            
             # Get expected columns (after feature engineering)
             cols_to_drop = [
                 'log_price', 'price_clean', 'url', 'title_list', 'description',
@@ -60,30 +93,250 @@ class ModelLoader:
             self.expected_columns = [
                 col for col in self.training_data.columns if col not in valid_cols_to_drop
             ]
+            
+            # Keep only the per-column dtypes consumed at predict time and
+            # release the frame itself
+            self._dtypes = {col: self.training_data[col].dtype for col in self.expected_columns}
+            # Categories of the text columns as the training pipeline saw
+            # them; native categorical models index them by code
+            self._categories = {
+                col: self.training_data[col].astype('category').cat.categories.tolist()
+                for col, dtype in self._dtypes.items() if dtype.kind == 'O'
+            }
+            self.training_data = None
+            
+            # Precompute the feature row template used at predict time
+            col_dtypes = [self._row_dtype(self._dtypes[col]) for col in self.expected_columns]
+            self._col_index = {col: i for i, col in enumerate(self.expected_columns)}
+            self._record_dtype = np.dtype(list(zip(self.expected_columns, col_dtypes)))
+            self._defaults = np.array([self._row_default(dtype) for dtype in col_dtypes], dtype=object)
+        
+        self._predict_fn = self._build_predict_fn(self.model, self._categories)
+    
+    @staticmethod
+    def _build_predict_fn(model, categories=None):
+        """Pick the prediction path for the loaded model.
+        
+        For XGBoost estimators (optionally at the end of a Pipeline) the
+        preprocessed matrix is fed straight to the booster as a contiguous
+        float32 array, skipping the sklearn wrapper and DMatrix construction.
+        Models trained on native categoricals get the codes of the training
+        `categories` in that array, or a DataFrame with those categories when
+        the preprocessor can't be compiled.
+        """
+        steps = getattr(model, 'steps', None)
+        estimator = steps[-1][1] if steps else model
+        if not hasattr(estimator, 'get_booster'):
+            return lambda X: model.predict(ModelLoader.records_to_frame(X))
+        
+        categories = categories or {}
+        preprocessor = model[:-1] if steps and len(steps) > 1 else None
+        transform = None
+        if preprocessor is not None:
+            transform = ModelLoader._compile_preprocessor(preprocessor, categories)
+            if transform is None:
+                sklearn_transform = preprocessor.transform
+                transform = lambda X: sklearn_transform(ModelLoader.records_to_frame(X))
+        booster = estimator.get_booster()
+        try:
+            iteration_range = (0, estimator.best_iteration + 1)
+        except AttributeError:
+            iteration_range = (0, 0)
+        
+        def predict(X):
+            if transform is not None:
+                X = transform(X)
+            if isinstance(X, pd.DataFrame):
+                # XGBoost reads category codes, so they must follow the training
+                # categories; values unseen in training become missing first,
+                # as pandas no longer drops them silently when casting
+                X = X.assign(**{
+                    col: pd.Categorical(X[col].where(X[col].isin(cats)), categories=cats)
+                    for col, cats in categories.items()
+                    if col in X and X[col].dtype.kind == 'O'
+                })
+            else:
+                X = np.ascontiguousarray(X, dtype=np.float32)
+            return booster.inplace_predict(X, iteration_range=iteration_range, missing=estimator.missing)
+        
+        return predict
+    
+    @staticmethod
+    def _compile_preprocessor(preprocessor, categories=None):
+        """Compile a fitted ColumnTransformer into a NumPy-only transform.
+        
+        The fitted imputer statistics and one-hot categories are turned into
+        plain arrays and lookup dicts, so a prediction skips sklearn's
+        per-call validation and dispatch. Only the layouts built by
+        models/run.py are supported (SimpleImputer pipelines, optionally ending
+        in a OneHotEncoder, plus passthrough columns); anything else returns
+        None and the sklearn transform is used instead. Passthrough columns
+        listed in `categories` are written as their code in that list, with
+        unknown and missing values as NaN (missing for XGBoost).
+        
+        The transform reads columns by name, so it accepts a DataFrame or a
+        structured record array and fills a single float32 matrix in one pass.
+        """
+        if isinstance(preprocessor, Pipeline) and len(preprocessor.steps) == 1:
+            preprocessor = preprocessor.steps[0][1]
+        if not isinstance(preprocessor, ColumnTransformer):
+            return None
+        
+        categories = categories or {}
+        blocks = []
+        width = 0
+        for _, transformer, columns in preprocessor.transformers_:
+            if isinstance(transformer, str) and transformer == 'drop' or len(columns) == 0:
+                continue
+            columns = list(columns)
+            if not all(isinstance(col, str) for col in columns):
+                return None
+            
+            if (isinstance(transformer, str) and transformer == 'passthrough') or (
+                isinstance(transformer, FunctionTransformer) and transformer.func is None
+            ):
+                categorical = [col in categories for col in columns]
+                if all(categorical):
+                    lookups = [{value: i for i, value in enumerate(categories[col])} for col in columns]
+                    blocks.append(('category', columns, None, lookups))
+                elif not any(categorical):
+                    blocks.append(('passthrough', columns, None, None))
+                else:
+                    return None
+                width += len(columns)
+                continue
+            
+            steps = [step for _, step in transformer.steps] if isinstance(transformer, Pipeline) else [transformer]
+            imputer = steps[0]
+            if (
+                not isinstance(imputer, SimpleImputer)
+                or imputer.add_indicator
+                or not pd.isna(imputer.missing_values)
+                or pd.isna(imputer.statistics_).any()
+            ):
+                return None
+            
+            if len(steps) == 1:
+                blocks.append(('impute', columns, imputer.statistics_.astype(np.float64), None))
+                width += len(columns)
+            elif len(steps) == 2 and isinstance(steps[1], OneHotEncoder):
+                encoder = steps[1]
+                if (
+                    encoder.handle_unknown != 'ignore'
+                    or encoder.drop_idx_ is not None
+                    or encoder.min_frequency is not None
+                    or encoder.max_categories is not None
+                ):
+                    return None
+                lookups = [{value: i for i, value in enumerate(cats)} for cats in encoder.categories_]
+                blocks.append(('onehot', columns, imputer.statistics_, lookups))
+                width += sum(len(lookup) for lookup in lookups)
+            else:
+                return None
+        
+        def transform(X) -> np.ndarray:
+            out = np.zeros((len(X), width), dtype=np.float32)
+            offset = 0
+            for kind, columns, fill, lookups in blocks:
+                for k, col in enumerate(columns):
+                    if kind == 'onehot':
+                        # NaN is imputed; other unknown values (including None)
+                        # are ignored by the encoder and leave the row all zeros
+                        lookup = lookups[k]
+                        values = np.asarray(X[col], dtype=object)
+                        codes = np.array(
+                            [lookup.get(fill[k] if value != value else value, -1) for value in values],
+                            dtype=np.intp
+                        )
+                        rows = np.flatnonzero(codes >= 0)
+                        out[rows, offset + codes[rows]] = 1.0
+                        offset += len(lookup)
+                    elif kind == 'category':
+                        lookup = lookups[k]
+                        values = np.asarray(X[col], dtype=object)
+                        out[:, offset] = [lookup.get(value, np.nan) for value in values]
+                        offset += 1
+                    else:
+                        values = np.asarray(X[col], dtype=np.float64)
+                        if kind == 'impute':
+                            values = np.where(np.isnan(values), fill[k], values)
+                        out[:, offset] = values
+                        offset += 1
+            return out
+        
+        return transform
+    
+    @staticmethod
+    def records_to_frame(X):
+        """Wrap structured feature records in a DataFrame; other inputs pass through.
+        
+        Object columns keep object dtype so missing categoricals stay None
+        instead of being inferred as NaN (which the imputer would fill).
+        """
+        if not isinstance(X, np.ndarray) or X.dtype.names is None:
+            return X
+        return pd.DataFrame({
+            name: pd.Series(X[name], dtype=object) if X.dtype[name].kind == 'O' else X[name]
+            for name in X.dtype.names
+        })
+    
+    @staticmethod
+    def _row_dtype(dtype) -> np.dtype:
+        """Map a training column dtype to the dtype used in the feature row."""
+        kind = dtype.kind
+        if kind == 'b':
+            return np.dtype(bool)
+        elif kind in 'iu':
+            return np.dtype('int64')
+        elif kind == 'f':
+            # XGBoost scores on float32, so narrower rows lose nothing
+            return np.dtype('float32')
+        return np.dtype(object)
+    
+    @staticmethod
+    def _row_default(dtype: np.dtype):
+        """Default value for a feature row column that is missing from the input."""
+        if dtype.kind == 'b':
+            return False
+        elif dtype.kind == 'O':
+            return None
+        return dtype.type(0)
     
     def get_model(self):
         """Get loaded model."""
         return self.model
     
+    def predict(self, X) -> np.ndarray:
+        """Predict log prices for prepared features (DataFrame or structured records)."""
+        return self._predict_fn(X)
+    
     def get_brand_mapping(self, marca: str) -> str:
         """Map brand to top 20 or BRAND_OTHER."""
-        if self.top_20_brands and marca in self.top_20_brands:
-            return marca
-        return 'BRAND_OTHER'
+        return self._brand_map.get(marca, 'BRAND_OTHER')
     
     def get_state_mapping(self, state: str) -> str:
         """Map state to STATE_OTHER if rare."""
-        if self.rare_states and state in self.rare_states:
-            return 'STATE_OTHER'
-        return state
+        return self._state_map.get(state, state)
     
     def get_expected_columns(self):
         """Get expected feature columns."""
         return self.expected_columns
     
+    def get_column_index(self):
+        """Get mapping from expected column name to its position in the feature row."""
+        return self._col_index
+    
+    def get_record_dtype(self):
+        """Get structured dtype of a single feature row."""
+        return self._record_dtype
+    
+    def new_feature_row(self):
+        """Get a fresh feature row filled with per-column defaults."""
+        if self._defaults is None:
+            return None
+        return self._defaults.copy()
+    
     def get_column_dtype(self, col: str):
         """Get data type for a column."""
-        if self.training_data is not None and col in self.training_data.columns:
-            return self.training_data[col].dtype
-        return None
+        return self._dtypes.get(col)
 
@@ -1,12 +1,13 @@
 """Pydantic models for API request/response."""
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, field_validator
+import math
+from typing import List, Optional
 
 class CarFeatures(BaseModel):
     """Car features for price prediction."""
     ano: float = Field(..., description="Year of the car")
-    quilometragem: Optional[float] = Field(None, description="Mileage in km")
-    motor: Optional[float] = Field(None, description="Engine size")
+    quilometragem: Optional[float] = Field(0.0, description="Mileage in km")
+    motor: Optional[float] = Field(0.0, description="Engine size")
     marca: str = Field(..., description="Car brand")
     state: str = Field(..., description="State (e.g., SP, RJ)")
     cambio: Optional[str] = Field(None, description="Transmission type (Automático, Manual)")
@@ -16,9 +17,9 @@ class CarFeatures(BaseModel):
     tipo_de_veiculo: Optional[str] = Field(None, description="Vehicle type")
     tipo_de_direcao: Optional[str] = Field(None, description="Steering type detail")
     possui_kit_gnv: Optional[str] = Field(None, description="Has GNV kit (Sim, Não)")
-    portas: Optional[float] = Field(None, description="Number of doors")
-    potencia: Optional[float] = Field(None, description="Power")
-    final_de_placa: Optional[float] = Field(None, description="License plate final digit")
+    portas: Optional[float] = Field(0.0, description="Number of doors")
+    potencia: Optional[float] = Field(0.0, description="Power")
+    final_de_placa: Optional[float] = Field(0.0, description="License plate final digit")
     
     # Boolean features - using a list to avoid repetition
     air_bag: Optional[bool] = Field(False, description="Has airbag")
@@ -69,6 +70,14 @@ class CarFeatures(BaseModel):
     com_garantia_de_fabrica: Optional[bool] = Field(False, description="Factory warranty")
     com_chave_reserva: Optional[bool] = Field(False, description="With spare key")
 
+    @field_validator('quilometragem', 'motor', 'portas', 'potencia', 'final_de_placa')
+    @classmethod
+    def missing_numeric_as_zero(cls, v):
+        """Missing numeric values (null or NaN) count as zero, as in the model features."""
+        if v is None or math.isnan(v):
+            return 0.0
+        return v
+
     class Config:
         json_schema_extra = {
             "example": {
@@ -88,3 +97,12 @@ class CarFeatures(BaseModel):
             }
         }
 
+class PricePrediction(BaseModel):
+    """Predicted price for a single car."""
+    predicted_price: float = Field(..., description="Predicted price")
+    predicted_price_log: float = Field(..., description="Predicted price on the model's log1p scale")
+    currency: str = Field("BRL", description="Currency of the predicted price")
+
+class BatchPricePrediction(BaseModel):
+    """Predicted prices for a batch of cars, in input order."""
+    predictions: List[PricePrediction] = Field(..., description="One prediction per input car")
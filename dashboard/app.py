@@ -1,6 +1,8 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
+import math
+import pyarrow.parquet as pq
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
@@ -48,6 +50,157 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
+# Columns of the cleaned data that the dashboard reads; nothing else is loaded
+REQUIRED_COLUMNS = ['price_clean', 'marca', 'state_clean', 'ano_limpo', 'quilometragem_clean']
+# Luxury flags are packed into one uint16 column, each owning a fixed bit
+LUXURY_COLUMNS = ['bancos_de_couro', 'teto_solar', 'tracao_4x4', 'blindado', 'unico_dono', 'ar_condicionado']
+LUX_BITS = {name: 1 << i for i, name in enumerate(LUXURY_COLUMNS)}
+USED_COLUMNS = REQUIRED_COLUMNS + ['motor_clean', 'câmbio', 'combustível', 'direção', 'cor'] + LUXURY_COLUMNS
+DERIVED_COLUMNS = ['log_price', 'car_age', 'km_per_year']
+
+# Measures that only feed charts and summary stats, so float32 precision is plenty
+FLOAT32_COLUMNS = ['price_clean', 'quilometragem_clean', 'motor_clean', 'car_age', 'km_per_year', 'log_price']
+SMALL_INT_COLUMNS = {'ano_limpo': 'int16'}
+
+# Price segments (right-inclusive bins)
+PRICE_SEGMENT_BINS = [0, 30000, 60000, 100000, 200000, float('inf')]
+PRICE_SEGMENT_LABELS = ['Econômico (<30k)', 'Popular (30k-60k)', 'Médio (60k-100k)', 'Alto (100k-200k)', 'Luxo (>200k)']
+
+# Columns shown in the correlation matrices
+NUMERIC_CORR_COLUMNS = ['log_price', 'car_age', 'km_per_year', 'quilometragem_clean', 'motor_clean']
+LUXURY_CORR_COLUMNS = ['bancos_de_couro', 'teto_solar', 'tracao_4x4', 'blindado', 'unico_dono']
+
+def engineer_features(price, year, km, current_year=2025):
+    """Derive (log_price, car_age, km_per_year) arrays from price, year and mileage.
+    
+    Ages at or below zero become 0.5 and non-finite mileage ratios become 0.
+    Every step writes into the output arrays, so no float temporaries are made.
+    """
+    log_price = np.log1p(price)
+    car_age = np.subtract(current_year, year)
+    np.copyto(car_age, 0.5, where=car_age <= 0)
+    
+    km_per_year = np.empty_like(car_age)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(km, car_age, out=km_per_year)
+    np.copyto(km_per_year, 0.0, where=~np.isfinite(km_per_year))
+    return log_price, car_age, km_per_year
+
+def read_parquet_columns(path, columns):
+    """Read only the given columns of a Parquet file, skipping those it lacks."""
+    available = set(pq.read_schema(path).names)
+    return pd.read_parquet(path, engine='pyarrow', columns=[col for col in columns if col in available])
+
+def downcast_frame(df):
+    """Shrink the loaded frame: float32 measures, small ints and categorical strings."""
+    df = df.astype({col: 'float32' for col in FLOAT32_COLUMNS if col in df.columns})
+    for col, dtype in SMALL_INT_COLUMNS.items():
+        # Integer dtypes cannot hold missing values, so those columns keep floats
+        if col in df.columns and df[col].notna().all():
+            df[col] = df[col].astype(dtype)
+    
+    # Low-cardinality text columns (brands, states, fuel, ...) become categoricals
+    for col in df.columns:
+        if (df[col].dtype == object or pd.api.types.is_string_dtype(df[col].dtype)) and df[col].nunique() < 1000:
+            df[col] = df[col].astype('category')
+    return df
+
+def pack_luxury_flags(df):
+    """Replace the luxury bool columns with a single `luxury_mask` bitmask column.
+    
+    Returns the frame and the luxury features that were present in the data.
+    """
+    present = [col for col in LUXURY_COLUMNS if col in df.columns]
+    bits = np.zeros(len(df), dtype=np.uint16)
+    for col in present:
+        bits |= df[col].to_numpy(dtype=bool, na_value=False).astype(np.uint16) << LUXURY_COLUMNS.index(col)
+    df = df.drop(columns=present)
+    df['luxury_mask'] = bits
+    return df, tuple(present)
+
+def unpack_luxury_flags(frame, features):
+    """Expand the luxury bitmask of a frame into an (n_rows, len(features)) bool array."""
+    masks = frame['luxury_mask'].to_numpy(dtype='<u2')
+    bits = np.unpackbits(masks[:, None].view(np.uint8), axis=1, bitorder='little')
+    return bits[:, [LUXURY_COLUMNS.index(feature) for feature in features]].astype(bool)
+
+def feature_array(frame, columns):
+    """float64 array of the given columns, expanding luxury flags from the bitmask."""
+    columns = list(columns)
+    flags = [col for col in columns if col in LUX_BITS]
+    if not flags:
+        return frame[columns].to_numpy(dtype=np.float64)
+    X = np.empty((len(frame), len(columns)))
+    plain = [i for i, col in enumerate(columns) if col not in LUX_BITS]
+    X[:, plain] = frame[[columns[i] for i in plain]].to_numpy(dtype=np.float64)
+    X[:, [columns.index(col) for col in flags]] = unpack_luxury_flags(frame, flags)
+    return X
+
+def correlation_matrix(frame, columns):
+    """Pearson correlations over pairwise-complete rows, like DataFrame.corr().
+    
+    All pairwise sums come from a few matrix products over one float64 array
+    instead of pandas' per-pair loop; missing values are masked out per pair.
+    """
+    columns = list(columns)
+    X = feature_array(frame, columns)
+    present = ~np.isnan(X)
+    # Centering first keeps the sums small and the subtraction below accurate
+    X = np.where(present, X - np.nanmean(X, axis=0), 0.0)
+    W = present.astype(np.float64)
+    
+    # [i, j] entries are taken over the rows where both columns i and j are present
+    n = W.T @ W
+    sums = X.T @ W
+    sq_sums = (X * X).T @ W
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = X.T @ X - sums * sums.T / n
+        var = sq_sums - sums * sums / n
+        corr = np.clip(cov / np.sqrt(var * var.T), -1.0, 1.0)
+    return pd.DataFrame(corr, index=columns, columns=columns)
+
+def precompute_aggregates(df, luxury_columns):
+    """Whole-dataset aggregations shared by the Home and Statistics pages."""
+    corr_cols = [col for col in NUMERIC_CORR_COLUMNS if col in df.columns]
+    corr_cols += [col for col in LUXURY_CORR_COLUMNS if col in luxury_columns]
+    return {
+        'luxury_columns': luxury_columns,
+        'brand_counts': df['marca'].value_counts(),
+        'state_counts': df['state_clean'].value_counts(),
+        # Listings (size) and mean price per brand in one hash aggregation
+        'brand_stats': df.groupby('marca', observed=True)['price_clean'].agg(['size', 'mean']),
+        'corr_all': correlation_matrix(df, corr_cols),
+        'segment_analysis': df.groupby('price_segment', observed=True).agg({
+            'price_clean': ['count', 'mean', 'median'],
+            'car_age': 'mean',
+            'quilometragem_clean': 'mean',
+            'motor_clean': 'mean'
+        }).round(2),
+        'segment_counts': df['price_segment'].value_counts(),
+        # Prices sorted by (brand, year) for binary-search range lookups; rows
+        # without a brand or year never match and would break the lexsort
+        'similar_index': (
+            df.dropna(subset=['marca', 'ano_limpo'])
+            .set_index(['marca', 'ano_limpo'])['price_clean']
+            .sort_index()
+        ),
+    }
+
+def sorted_options(column):
+    """Sorted distinct non-missing values of a column, for selectboxes."""
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        # Categories built from the data are already sorted and deduplicated
+        return tuple(column.cat.remove_unused_categories().cat.categories)
+    return tuple(sorted(column.dropna().unique()))
+
+def build_select_options(df):
+    """Selectbox options for the filter and prediction widgets."""
+    return {
+        col: sorted_options(df[col])
+        for col in ['marca', 'state_clean', 'câmbio', 'combustível', 'direção', 'cor', 'price_segment']
+        if col in df.columns
+    }
+
 # Initialize session state
 @st.cache_resource
 def load_model_and_data():
@@ -56,163 +209,200 @@ def load_model_and_data():
     model_loader.load()
     feature_processor = FeatureProcessor(model_loader)
     
-    # Load data
-    data_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 
-                             'data', 'processed', 'olx_cars_cleaned.csv')
-    df = pd.read_csv(data_path)
+    # Load data: prefer the Parquet frame written by the feature step, which
+    # already carries the derived columns, over the ETL output
+    processed_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                 'data', 'processed')
+    dashboard_path = os.path.join(processed_dir, 'olx_cars_dashboard.parquet')
+    if os.path.exists(dashboard_path):
+        df = read_parquet_columns(dashboard_path, USED_COLUMNS + DERIVED_COLUMNS)
+    else:
+        df = read_parquet_columns(os.path.join(processed_dir, 'olx_cars_cleaned.parquet'), USED_COLUMNS)
+        
+        # Feature engineering
+        df['quilometragem_clean'] = df['quilometragem_clean'].fillna(0)
+        df['log_price'], df['car_age'], df['km_per_year'] = engineer_features(
+            df['price_clean'].to_numpy(dtype=np.float64),
+            df['ano_limpo'].to_numpy(dtype=np.float64),
+            df['quilometragem_clean'].to_numpy(dtype=np.float64)
+        )
     
-    # Feature engineering
-    CURRENT_YEAR = 2025
-    df['log_price'] = np.log1p(df['price_clean'])
-    df['car_age'] = CURRENT_YEAR - df['ano_limpo']
-    df.loc[df['car_age'] <= 0, 'car_age'] = 0.5
-    df['quilometragem_clean'] = df['quilometragem_clean'].fillna(0)
-    df['km_per_year'] = df['quilometragem_clean'] / df['car_age']
-    df['km_per_year'] = df['km_per_year'].replace([np.inf, -np.inf], np.nan).fillna(0)
+    missing = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing:
+        st.warning(f"Colunas não encontradas nos dados: {missing}")
     
-    return model_loader, feature_processor, df
+    df = downcast_frame(df)
+    df, luxury_columns = pack_luxury_flags(df)
+    # Bucketed once here; pd.cut with labels yields an ordered categorical
+    df['price_segment'] = pd.cut(df['price_clean'], bins=PRICE_SEGMENT_BINS, labels=PRICE_SEGMENT_LABELS)
+    return model_loader, feature_processor, df, precompute_aggregates(df, luxury_columns), build_select_options(df)
 
 # Load resources
 try:
-    model_loader, feature_processor, df = load_model_and_data()
+    model_loader, feature_processor, df, precomputed, options = load_model_and_data()
 except Exception as e:
     st.error(f"Erro ao carregar modelo ou dados: {str(e)}")
     st.stop()
 
-# Sidebar navigation
-st.sidebar.title("Navegação")
-page = st.sidebar.radio(
-    "Selecione uma página",
-    ["Início", "Análise Exploratória", "Predição de Preço", "Estatísticas"]
-)
-
-# Home page
-if page == "Início":
-    st.markdown('<h1 class="main-header">Used Car Market Intelligence</h1>', unsafe_allow_html=True)
-    
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        st.metric("Total de Carros", f"{len(df):,}")
-    
-    with col2:
-        avg_price = df['price_clean'].mean()
-        st.metric("Preço Médio", f"R$ {avg_price:,.0f}")
-    
-    with col3:
-        total_brands = df['marca'].nunique()
-        st.metric("Marcas Diferentes", total_brands)
-    
-    st.markdown("---")
-    
-    st.markdown("""
-    ### Sobre o Dashboard
-    
-    Este dashboard oferece uma análise completa do mercado de carros usados, incluindo:
-    
-    - **Análise Exploratória**: Visualizações interativas dos dados
-    - **Predição de Preço**: Interface para prever o preço de um carro
-    - **Estatísticas**: Análises detalhadas do mercado
-    
-    ### Funcionalidades
-    
-    1. **Exploração de Dados**: Gráficos interativos sobre distribuição de preços, marcas, estados e características
-    2. **Predição Inteligente**: Modelo de machine learning para estimar preços baseado em características do veículo
-    3. **Análises Estatísticas**: Correlações, distribuições e insights do mercado
-    """)
-    
-    # Quick stats
-    st.markdown("### Estatísticas Rápidas")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.subheader("Top 10 Marcas")
-        top_brands = df['marca'].value_counts().head(10)
-        st.bar_chart(top_brands)
-    
-    with col2:
-        st.subheader("Distribuição por Estado")
-        top_states = df['state_clean'].value_counts().head(10)
-        st.bar_chart(top_states)
-
-# Exploratory Data Analysis page
-elif page == "Análise Exploratória":
-    st.title("Análise Exploratória de Dados")
-    
-    # Filters
-    st.sidebar.header("Filtros")
-    
-    # Brand filter
-    all_brands = ['Todos'] + sorted(df['marca'].unique().tolist())
-    selected_brand = st.sidebar.selectbox("Marca", all_brands)
-    
-    # State filter
-    all_states = ['Todos'] + sorted(df['state_clean'].dropna().unique().tolist())
-    selected_state = st.sidebar.selectbox("Estado", all_states)
-    
-    # Price range filter
-    min_price = float(df['price_clean'].min())
-    max_price = float(df['price_clean'].max())
-    price_range = st.sidebar.slider(
-        "Faixa de Preço (R$)",
-        min_value=min_price,
-        max_value=max_price,
-        value=(min_price, max_price),
-        step=1000.0
-    )
-    
-    # Apply filters
-    filtered_df = df.copy()
+# Cached EDA computations, keyed on the filter values instead of the DataFrame
+# itself so Streamlit never has to hash the data
+@st.cache_data(ttl=3600)
+def filter_data(selected_brand, selected_state, price_range):
+    """Rows matching the EDA sidebar filters."""
+    # One combined mask and a single row selection, with no intermediate frames
+    mask = df['price_clean'].between(price_range[0], price_range[1]).to_numpy()
     if selected_brand != 'Todos':
-        filtered_df = filtered_df[filtered_df['marca'] == selected_brand]
+        mask = mask & (df['marca'] == selected_brand).to_numpy()
     if selected_state != 'Todos':
-        filtered_df = filtered_df[filtered_df['state_clean'] == selected_state]
-    filtered_df = filtered_df[
-        (filtered_df['price_clean'] >= price_range[0]) & 
-        (filtered_df['price_clean'] <= price_range[1])
-    ]
+        mask = mask & (df['state_clean'] == selected_state).to_numpy()
+    return df[mask]
+
+@st.cache_data(ttl=3600)
+def filtered_value_counts(filters, column):
+    """Value counts of a column in the filtered data."""
+    counts = filter_data(*filters)[column].value_counts()
+    # Categorical columns also count categories that the filters removed
+    return counts[counts > 0]
+
+@st.cache_data(ttl=3600)
+def filtered_mean_price(filters, column):
+    """Mean price per value of a column in the filtered data, most expensive first."""
+    return filter_data(*filters).groupby(column)['price_clean'].mean().sort_values(ascending=False)
+
+@st.cache_data(ttl=3600)
+def filtered_histogram(filters, column, nbins):
+    """Bin counts and edges of a column in the filtered data, ignoring missing values."""
+    values = filter_data(*filters)[column].to_numpy(dtype=np.float64)
+    return np.histogram(values[~np.isnan(values)], bins=nbins)
+
+@st.cache_data(ttl=3600)
+def filtered_corr(filters, columns):
+    """Correlation matrix of the given columns in the filtered data."""
+    return correlation_matrix(filter_data(*filters), columns)
+
+@st.cache_data(ttl=3600)
+def filtered_luxury_impact(filters, features):
+    """Mean price with minus mean price without each boolean feature, in the filtered data."""
+    filtered_df = filter_data(*filters)
+    prices = filtered_df['price_clean'].to_numpy(dtype=np.float64)
+    has_price = ~np.isnan(prices)
+    prices = prices[has_price]
+    flags = unpack_luxury_flags(filtered_df, features)[has_price]
+    
+    # Sums for every feature at once: one matrix product per side
+    with np.errstate(divide='ignore', invalid='ignore'):
+        with_feature = (prices @ flags) / flags.sum(axis=0)
+        without_feature = (prices @ ~flags) / (~flags).sum(axis=0)
+    return with_feature - without_feature
+
+@st.cache_data(ttl=3600)
+def filtered_box_stats(filters, brands):
+    """Per-brand log price box statistics in the filtered data, in `brands` order.
+    
+    Quartiles use linear interpolation and the whiskers reach the furthest
+    values within 1.5 IQR of the box, as Plotly computes them from raw data.
+    """
+    filtered_df = filter_data(*filters)
+    top_df = filtered_df[filtered_df['marca'].isin(brands)]
+    grouped = top_df.groupby('marca')['log_price']
+    
+    q1 = grouped.transform('quantile', 0.25)
+    q3 = grouped.transform('quantile', 0.75)
+    iqr = q3 - q1
+    fenced = top_df['log_price'][top_df['log_price'].between(q1 - 1.5 * iqr, q3 + 1.5 * iqr)]
+    fenced = fenced.groupby(top_df['marca'], observed=True)
+    
+    stats = pd.DataFrame({
+        'q1': grouped.quantile(0.25),
+        'median': grouped.median(),
+        'q3': grouped.quantile(0.75),
+        'lowerfence': fenced.min(),
+        'upperfence': fenced.max(),
+    })
+    return stats.reindex([brand for brand in brands if brand in stats.index]).dropna()
+
+@st.cache_data(ttl=600)
+def predict_price(car_items):
+    """Predicted price for a car given as a tuple of CarFeatures (field, value) pairs."""
+    car = CarFeatures(**dict(car_items))
+    features_df = feature_processor.prepare_features(car)
+    log_price_pred = model_loader.predict(features_df)[0]
+    return math.expm1(float(log_price_pred))
+
+# Bar charts are purely informational: render them as static images without
+# the interactive mode bar
+STATIC_CHART_CONFIG = {'staticPlot': True, 'displayModeBar': False}
+
+def side_by_side_bars(left, right, titles, x_titles, y_title):
+    """One figure holding two horizontal bar charts (value per index label)."""
+    fig = make_subplots(rows=1, cols=2, subplot_titles=titles, horizontal_spacing=0.15)
+    for col, series in enumerate((left, right), start=1):
+        fig.add_trace(
+            go.Bar(x=series.values, y=series.index.astype(str), orientation='h',
+                   marker_color=px.colors.qualitative.Plotly[0]),
+            row=1, col=col
+        )
+        fig.update_xaxes(title_text=x_titles[col - 1], row=1, col=col)
+        fig.update_yaxes(title_text=y_title, row=1, col=col)
+    fig.update_layout(showlegend=False, height=500)
+    return fig
+
+# Scatter plots beyond this many points are sampled down; the point cloud looks
+# the same but the browser only has to draw a bounded number of markers
+MAX_SCATTER_POINTS = 20000
+
+def histogram_figure(counts, edges, title, x_title):
+    """Bar chart of precomputed histogram bins; only the bin heights reach the browser."""
+    fig = go.Figure(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges)))
+    fig.update_layout(title=title, xaxis_title=x_title, yaxis_title='Frequência', height=400, showlegend=False)
+    return fig
+
+def sample_for_scatter(frame):
+    """Sample a frame down to at most MAX_SCATTER_POINTS rows for plotting."""
+    if len(frame) > MAX_SCATTER_POINTS:
+        return frame.sample(MAX_SCATTER_POINTS, random_state=0)
+    return frame
+
+# Each fragment reruns on its own when one of its widgets changes, so picking
+# a chart view, filling in the prediction form or switching the segment only
+# rebuilds that part of the page instead of rerunning the whole script
+@st.fragment
+def render_eda_views(filters):
+    """Charts of the EDA page for the given sidebar filters."""
+    filtered_df = filter_data(*filters)
     
     st.info(f"Mostrando {len(filtered_df):,} carros de {len(df):,} total")
     
-    # Tabs for different visualizations
-    tab1, tab2, tab3, tab4 = st.tabs(["Preços", "Marcas e Estados", "Características", "Correlações"])
+    # Only the selected view is built: st.tabs would run every tab body (and
+    # build every figure) on each rerun even though only one is visible
+    view = st.radio(
+        "Visualização",
+        ["Preços", "Marcas e Estados", "Características", "Correlações"],
+        horizontal=True,
+        label_visibility="collapsed"
+    )
     
-    with tab1:
+    if view == "Preços":
         st.subheader("Distribuição de Preços")
         
         col1, col2 = st.columns(2)
         
         with col1:
             # Price distribution
-            fig = px.histogram(
-                filtered_df,
-                x='price_clean',
-                nbins=50,
-                title='Distribuição de Preços',
-                labels={'price_clean': 'Preço (R$)', 'count': 'Frequência'},
-                height=400
-            )
-            fig.update_layout(showlegend=False)
+            counts, edges = filtered_histogram(filters, 'price_clean', 50)
+            fig = histogram_figure(counts, edges, 'Distribuição de Preços', 'Preço (R$)')
             st.plotly_chart(fig, use_container_width=True)
         
         with col2:
             # Log price distribution
-            fig = px.histogram(
-                filtered_df,
-                x='log_price',
-                nbins=50,
-                title='Distribuição de Preços (Log)',
-                labels={'log_price': 'Log(Preço)', 'count': 'Frequência'},
-                height=400
-            )
-            fig.update_layout(showlegend=False)
+            counts, edges = filtered_histogram(filters, 'log_price', 50)
+            fig = histogram_figure(counts, edges, 'Distribuição de Preços (Log)', 'Log(Preço)')
             st.plotly_chart(fig, use_container_width=True)
         
         # Price by age
         st.subheader("Preço vs Idade do Carro")
         # Filter out NaN values for size parameter
-        scatter_df_age = filtered_df.dropna(subset=['quilometragem_clean', 'car_age', 'price_clean'])
+        scatter_df_age = sample_for_scatter(filtered_df.dropna(subset=['quilometragem_clean', 'car_age', 'price_clean']))
         if len(scatter_df_age) > 0:
             fig = px.scatter(
                 scatter_df_age,
@@ -222,6 +412,7 @@ elif page == "Análise Exploratória":
                 size='quilometragem_clean',
                 hover_data=['marca', 'state_clean'],
                 title='Preço vs Idade do Carro',
+                render_mode='webgl',
                 labels={'car_age': 'Idade (anos)', 'price_clean': 'Preço (R$)'},
                 height=500
             )
@@ -232,7 +423,7 @@ elif page == "Análise Exploratória":
         # Price by mileage
         st.subheader("Preço vs Quilometragem")
         # Filter out NaN values for size parameter
-        scatter_df_km = filtered_df.dropna(subset=['motor_clean', 'quilometragem_clean', 'price_clean'])
+        scatter_df_km = sample_for_scatter(filtered_df.dropna(subset=['motor_clean', 'quilometragem_clean', 'price_clean']))
         if len(scatter_df_km) > 0:
             fig = px.scatter(
                 scatter_df_km,
@@ -242,6 +433,7 @@ elif page == "Análise Exploratória":
                 size='motor_clean',
                 hover_data=['marca', 'state_clean'],
                 title='Preço vs Quilometragem',
+                render_mode='webgl',
                 labels={'quilometragem_clean': 'Quilometragem (km)', 'price_clean': 'Preço (R$)'},
                 height=500
             )
@@ -249,48 +441,44 @@ elif page == "Análise Exploratória":
         else:
             st.warning("Não há dados suficientes para exibir este gráfico.")
     
-    with tab2:
+    elif view == "Marcas e Estados":
         st.subheader("Análise por Marca")
         
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            # Top brands by count
-            top_brands = filtered_df['marca'].value_counts().head(15)
-            fig = px.bar(
-                x=top_brands.values,
-                y=top_brands.index,
-                orientation='h',
-                title='Top 15 Marcas (Quantidade)',
-                labels={'x': 'Quantidade', 'y': 'Marca'},
-                height=500
-            )
-            st.plotly_chart(fig, use_container_width=True)
-        
-        with col2:
-            # Average price by brand
-            avg_price_brand = filtered_df.groupby('marca')['price_clean'].mean().sort_values(ascending=False).head(15)
-            fig = px.bar(
-                x=avg_price_brand.values,
-                y=avg_price_brand.index,
-                orientation='h',
-                title='Top 15 Marcas (Preço Médio)',
-                labels={'x': 'Preço Médio (R$)', 'y': 'Marca'},
-                height=500
-            )
-            st.plotly_chart(fig, use_container_width=True)
+        # Top brands by count and by average price, side by side in one figure
+        top_brands = filtered_value_counts(filters, 'marca').head(15)
+        avg_price_brand = filtered_mean_price(filters, 'marca').head(15)
+        fig = side_by_side_bars(
+            top_brands, avg_price_brand,
+            titles=('Top 15 Marcas (Quantidade)', 'Top 15 Marcas (Preço Médio)'),
+            x_titles=('Quantidade', 'Preço Médio (R$)'),
+            y_title='Marca'
+        )
+        st.plotly_chart(fig, use_container_width=True, config=STATIC_CHART_CONFIG)
         
         # Box plot by brand
         st.subheader("Distribuição de Preços por Marca")
-        top_10_brands = filtered_df['marca'].value_counts().head(10).index
-        df_top_brands = filtered_df[filtered_df['marca'].isin(top_10_brands)]
-        
-        fig = px.box(
-            df_top_brands,
-            x='marca',
-            y='log_price',
+        top_10_brands = filtered_value_counts(filters, 'marca').head(10).index
+        box_stats = filtered_box_stats(filters, tuple(top_10_brands))
+        
+        # Boxes are drawn from precomputed statistics, so only a handful of
+        # numbers per brand are sent to the browser instead of every listing
+        fig = go.Figure([
+            go.Box(
+                name=str(brand),
+                q1=[stats['q1']],
+                median=[stats['median']],
+                q3=[stats['q3']],
+                lowerfence=[stats['lowerfence']],
+                upperfence=[stats['upperfence']],
+                marker_color=px.colors.qualitative.Plotly[0]
+            )
+            for brand, stats in box_stats.iterrows()
+        ])
+        fig.update_layout(
             title='Distribuição de Preços (Log) por Marca',
-            labels={'marca': 'Marca', 'log_price': 'Log(Preço)'},
+            xaxis_title='Marca',
+            yaxis_title='Log(Preço)',
+            showlegend=False,
             height=500
         )
         fig.update_xaxes(tickangle=45)
@@ -299,33 +487,17 @@ elif page == "Análise Exploratória":
         # State analysis
         st.subheader("Análise por Estado")
         
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            top_states = filtered_df['state_clean'].value_counts().head(15)
-            fig = px.bar(
-                x=top_states.values,
-                y=top_states.index,
-                orientation='h',
-                title='Top 15 Estados (Quantidade)',
-                labels={'x': 'Quantidade', 'y': 'Estado'},
-                height=500
-            )
-            st.plotly_chart(fig, use_container_width=True)
-        
-        with col2:
-            avg_price_state = filtered_df.groupby('state_clean')['price_clean'].mean().sort_values(ascending=False).head(15)
-            fig = px.bar(
-                x=avg_price_state.values,
-                y=avg_price_state.index,
-                orientation='h',
-                title='Top 15 Estados (Preço Médio)',
-                labels={'x': 'Preço Médio (R$)', 'y': 'Estado'},
-                height=500
-            )
-            st.plotly_chart(fig, use_container_width=True)
+        top_states = filtered_value_counts(filters, 'state_clean').head(15)
+        avg_price_state = filtered_mean_price(filters, 'state_clean').head(15)
+        fig = side_by_side_bars(
+            top_states, avg_price_state,
+            titles=('Top 15 Estados (Quantidade)', 'Top 15 Estados (Preço Médio)'),
+            x_titles=('Quantidade', 'Preço Médio (R$)'),
+            y_title='Estado'
+        )
+        st.plotly_chart(fig, use_container_width=True, config=STATIC_CHART_CONFIG)
     
-    with tab3:
+    elif view == "Características":
         st.subheader("Características dos Veículos")
         
         # Transmission type
@@ -333,7 +505,7 @@ elif page == "Análise Exploratória":
         
         with col1:
             if 'câmbio' in filtered_df.columns:
-                cambio_counts = filtered_df['câmbio'].value_counts()
+                cambio_counts = filtered_value_counts(filters, 'câmbio')
                 fig = px.pie(
                     values=cambio_counts.values,
                     names=cambio_counts.index,
@@ -344,7 +516,7 @@ elif page == "Análise Exploratória":
         
         with col2:
             if 'combustível' in filtered_df.columns:
-                fuel_counts = filtered_df['combustível'].value_counts()
+                fuel_counts = filtered_value_counts(filters, 'combustível')
                 fig = px.pie(
                     values=fuel_counts.values,
                     names=fuel_counts.index,
@@ -357,16 +529,15 @@ elif page == "Análise Exploratória":
         st.subheader("Impacto de Características de Luxo")
         
         luxury_features = ['bancos_de_couro', 'teto_solar', 'tracao_4x4', 'blindado', 'unico_dono']
-        available_features = [f for f in luxury_features if f in filtered_df.columns]
+        available_features = [f for f in luxury_features if f in precomputed['luxury_columns']]
         
         if available_features:
-            luxury_impact = {}
-            for feature in available_features:
-                with_feature = filtered_df[filtered_df[feature] == True]['price_clean'].mean()
-                without_feature = filtered_df[filtered_df[feature] == False]['price_clean'].mean()
-                luxury_impact[feature.replace('_', ' ').title()] = with_feature - without_feature
+            luxury_impact = filtered_luxury_impact(filters, tuple(available_features))
             
-            impact_df = pd.DataFrame(list(luxury_impact.items()), columns=['Característica', 'Diferença de Preço'])
+            impact_df = pd.DataFrame({
+                'Característica': [feature.replace('_', ' ').title() for feature in available_features],
+                'Diferença de Preço': luxury_impact
+            })
             impact_df = impact_df.sort_values('Diferença de Preço', ascending=True)
             
             fig = px.bar(
@@ -378,17 +549,16 @@ elif page == "Análise Exploratória":
                 labels={'Diferença de Preço': 'Diferença de Preço (R$)', 'Característica': 'Característica'},
                 height=400
             )
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(fig, use_container_width=True, config=STATIC_CHART_CONFIG)
     
-    with tab4:
+    elif view == "Correlações":
         st.subheader("Matriz de Correlação")
         
         # Select numeric columns
-        numeric_cols = ['log_price', 'car_age', 'km_per_year', 'quilometragem_clean', 'motor_clean']
-        luxury_bool = ['bancos_de_couro', 'teto_solar', 'tracao_4x4', 'blindado', 'unico_dono']
-        available_cols = [col for col in numeric_cols + luxury_bool if col in filtered_df.columns]
+        available_cols = [col for col in NUMERIC_CORR_COLUMNS if col in filtered_df.columns]
+        available_cols += [col for col in LUXURY_CORR_COLUMNS if col in precomputed['luxury_columns']]
         
-        corr_df = filtered_df[available_cols].corr()
+        corr_df = filtered_corr(filters, tuple(available_cols))
         
         fig = px.imshow(
             corr_df,
@@ -421,15 +591,9 @@ elif page == "Análise Exploratória":
                 for feature, corr in price_corr.tail(5).items():
                     st.write(f"- {feature}: {corr:.3f}")
 
-# Price Prediction page
-elif page == "Predição de Preço":
-    st.title("Predição de Preço de Carros Usados")
-    
-    st.markdown("""
-    Preencha as informações do veículo abaixo para obter uma predição de preço baseada em nosso modelo de machine learning.
-    """)
-    
-    # Form for car features
+@st.fragment
+def render_prediction_form():
+    """Prediction form and its result."""
     with st.form("prediction_form"):
         col1, col2 = st.columns(2)
         
@@ -439,14 +603,14 @@ elif page == "Predição de Preço":
             ano = st.number_input("Ano do Veículo", min_value=1950, max_value=2025, value=2020, step=1)
             quilometragem = st.number_input("Quilometragem (km)", min_value=0.0, value=50000.0, step=1000.0)
             motor = st.number_input("Motor (litros)", min_value=0.0, value=1.6, step=0.1)
-            marca = st.selectbox("Marca", sorted(df['marca'].unique().tolist()))
-            state = st.selectbox("Estado", sorted(df['state_clean'].dropna().unique().tolist()))
+            marca = st.selectbox("Marca", options['marca'])
+            state = st.selectbox("Estado", options['state_clean'])
             
             # Get available options from data
-            cambio_options = [''] + sorted(df['câmbio'].dropna().unique().tolist())
-            combustivel_options = [''] + sorted(df['combustível'].dropna().unique().tolist())
-            direcao_options = [''] + sorted(df['direção'].dropna().unique().tolist())
-            cor_options = [''] + sorted(df['cor'].dropna().unique().tolist())
+            cambio_options = ['', *options['câmbio']]
+            combustivel_options = ['', *options['combustível']]
+            direcao_options = ['', *options['direção']]
+            cor_options = ['', *options['cor']]
             
             cambio = st.selectbox("Câmbio", cambio_options)
             combustivel = st.selectbox("Combustível", combustivel_options)
@@ -520,13 +684,8 @@ elif page == "Predição de Preço":
                     rodas_de_liga_leve=rodas_de_liga_leve
                 )
                 
-                # Prepare features
-                features_df = feature_processor.prepare_features(car)
-                
-                # Make prediction
-                model = model_loader.get_model()
-                log_price_pred = model.predict(features_df)[0]
-                price_pred = np.expm1(log_price_pred)
+                # Make prediction (repeated submissions of the same car hit the cache)
+                price_pred = predict_price(tuple(car.model_dump().items()))
                 
                 # Display result
                 st.success("Predição realizada com sucesso!")
@@ -559,13 +718,13 @@ elif page == "Predição de Preço":
                 
                 with col3:
                     # Compare with similar cars
-                    similar = df[
-                        (df['marca'] == marca) &
-                        (df['ano_limpo'] >= ano - 2) &
-                        (df['ano_limpo'] <= ano + 2)
-                    ]
+                    similar_index = precomputed['similar_index']
+                    try:
+                        similar = similar_index.loc[(marca, slice(ano - 2, ano + 2))]
+                    except KeyError:
+                        similar = similar_index.iloc[:0]
                     if len(similar) > 0:
-                        avg_similar = similar['price_clean'].mean()
+                        avg_similar = similar.mean()
                         diff = price_pred - avg_similar
                         st.metric("vs. Similar no Mercado", f"R$ {diff:+,.0f}")
                 
@@ -573,6 +732,137 @@ elif page == "Predição de Preço":
                 st.error(f"Erro ao fazer predição: {str(e)}")
                 st.exception(e)
 
+@st.fragment
+def render_segment_features():
+    """Share of luxury features in a selected price segment."""
+    st.subheader("Top Características por Segmento")
+    
+    selected_segment = st.selectbox("Selecione um Segmento", options['price_segment'])
+    segment_df = df[df['price_segment'] == selected_segment]
+    
+    luxury_features = ['bancos_de_couro', 'teto_solar', 'tracao_4x4', 'blindado', 'ar_condicionado']
+    available_features = [f for f in luxury_features if f in precomputed['luxury_columns']]
+    
+    if available_features:
+        shares = unpack_luxury_flags(segment_df, available_features).sum(axis=0) / len(segment_df) * 100
+        feature_percentages = {
+            feature.replace('_', ' ').title(): pct for feature, pct in zip(available_features, shares)
+        }
+        
+        feature_df = pd.DataFrame(list(feature_percentages.items()), columns=['Característica', 'Percentual'])
+        feature_df = feature_df.sort_values('Percentual', ascending=True)
+        
+        fig = px.bar(
+            feature_df,
+            x='Percentual',
+            y='Característica',
+            orientation='h',
+            title=f'Percentual de Características no Segmento: {selected_segment}',
+            labels={'Percentual': 'Percentual (%)', 'Característica': 'Característica'},
+            height=400
+        )
+        st.plotly_chart(fig, use_container_width=True, config=STATIC_CHART_CONFIG)
+
+
+# Sidebar navigation
+st.sidebar.title("Navegação")
+page = st.sidebar.radio(
+    "Selecione uma página",
+    ["Início", "Análise Exploratória", "Predição de Preço", "Estatísticas"]
+)
+
+# Home page
+if page == "Início":
+    st.markdown('<h1 class="main-header">Used Car Market Intelligence</h1>', unsafe_allow_html=True)
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.metric("Total de Carros", f"{len(df):,}")
+    
+    with col2:
+        avg_price = df['price_clean'].mean()
+        st.metric("Preço Médio", f"R$ {avg_price:,.0f}")
+    
+    with col3:
+        total_brands = len(options['marca'])
+        st.metric("Marcas Diferentes", total_brands)
+    
+    st.markdown("---")
+    
+    st.markdown("""
+    ### Sobre o Dashboard
+    
+    Este dashboard oferece uma análise completa do mercado de carros usados, incluindo:
+    
+    - **Análise Exploratória**: Visualizações interativas dos dados
+    - **Predição de Preço**: Interface para prever o preço de um carro
+    - **Estatísticas**: Análises detalhadas do mercado
+    
+    ### Funcionalidades
+    
+    1. **Exploração de Dados**: Gráficos interativos sobre distribuição de preços, marcas, estados e características
+    2. **Predição Inteligente**: Modelo de machine learning para estimar preços baseado em características do veículo
+    3. **Análises Estatísticas**: Correlações, distribuições e insights do mercado
+    """)
+    
+    # Quick stats
+    st.markdown("### Estatísticas Rápidas")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("Top 10 Marcas")
+        top_brands = precomputed['brand_counts'].head(10)
+        st.bar_chart(top_brands)
+    
+    with col2:
+        st.subheader("Distribuição por Estado")
+        top_states = precomputed['state_counts'].head(10)
+        st.bar_chart(top_states)
+
+# Exploratory Data Analysis page
+elif page == "Análise Exploratória":
+    st.title("Análise Exploratória de Dados")
+    
+    # Filters
+    st.sidebar.header("Filtros")
+    
+    # Brand filter
+    all_brands = ['Todos', *options['marca']]
+    selected_brand = st.sidebar.selectbox("Marca", all_brands)
+    
+    # State filter
+    all_states = ['Todos', *options['state_clean']]
+    selected_state = st.sidebar.selectbox("Estado", all_states)
+    
+    # Price range filter
+    min_price = float(df['price_clean'].min())
+    max_price = float(df['price_clean'].max())
+    price_range = st.sidebar.slider(
+        "Faixa de Preço (R$)",
+        min_value=min_price,
+        max_value=max_price,
+        value=(min_price, max_price),
+        step=1000.0
+    )
+    
+    # Apply filters
+    filters = (selected_brand, selected_state, tuple(price_range))
+    # Sidebar widgets cannot live inside a fragment, so the filters stay here
+    render_eda_views(filters)
+
+# Price Prediction page
+elif page == "Predição de Preço":
+    st.title("Predição de Preço de Carros Usados")
+    
+    st.markdown("""
+    Preencha as informações do veículo abaixo para obter uma predição de preço baseada em nosso modelo de machine learning.
+    """)
+    
+    # Form for car features
+    render_prediction_form()
+
 # Statistics page
 elif page == "Estatísticas":
     st.title("Estatísticas Detalhadas")
@@ -607,59 +897,23 @@ elif page == "Estatísticas":
     with tab2:
         st.subheader("Análise por Segmento de Preço")
         
-        # Define price segments
-        df['price_segment'] = pd.cut(
-            df['price_clean'],
-            bins=[0, 30000, 60000, 100000, 200000, float('inf')],
-            labels=['Econômico (<30k)', 'Popular (30k-60k)', 'Médio (60k-100k)', 'Alto (100k-200k)', 'Luxo (>200k)']
-        )
-        
-        segment_analysis = df.groupby('price_segment').agg({
-            'price_clean': ['count', 'mean', 'median'],
-            'car_age': 'mean',
-            'quilometragem_clean': 'mean',
-            'motor_clean': 'mean'
-        }).round(2)
+        # Price segments are assigned at load time; the aggregations are cached
+        segment_analysis = precomputed['segment_analysis']
         
         st.dataframe(segment_analysis)
         
         # Visualization
+        segment_counts = precomputed['segment_counts']
         fig = px.bar(
-            x=df['price_segment'].value_counts().index,
-            y=df['price_segment'].value_counts().values,
+            x=segment_counts.index,
+            y=segment_counts.values,
             title='Distribuição por Segmento de Preço',
             labels={'x': 'Segmento', 'y': 'Quantidade'},
             height=400
         )
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig, use_container_width=True, config=STATIC_CHART_CONFIG)
         
-        st.subheader("Top Características por Segmento")
-        
-        selected_segment = st.selectbox("Selecione um Segmento", df['price_segment'].unique())
-        segment_df = df[df['price_segment'] == selected_segment]
-        
-        luxury_features = ['bancos_de_couro', 'teto_solar', 'tracao_4x4', 'blindado', 'ar_condicionado']
-        available_features = [f for f in luxury_features if f in segment_df.columns]
-        
-        if available_features:
-            feature_percentages = {}
-            for feature in available_features:
-                pct = (segment_df[feature].sum() / len(segment_df)) * 100
-                feature_percentages[feature.replace('_', ' ').title()] = pct
-            
-            feature_df = pd.DataFrame(list(feature_percentages.items()), columns=['Característica', 'Percentual'])
-            feature_df = feature_df.sort_values('Percentual', ascending=True)
-            
-            fig = px.bar(
-                feature_df,
-                x='Percentual',
-                y='Característica',
-                orientation='h',
-                title=f'Percentual de Características no Segmento: {selected_segment}',
-                labels={'Percentual': 'Percentual (%)', 'Característica': 'Característica'},
-                height=400
-            )
-            st.plotly_chart(fig, use_container_width=True)
+        render_segment_features()
     
     with tab3:
         st.subheader("Insights Principais")
@@ -667,11 +921,11 @@ elif page == "Estatísticas":
         insights = [
             {
                 "title": "Idade vs Preço",
-                "content": f"A idade do carro tem uma correlação negativa forte de {df[['car_age', 'log_price']].corr().iloc[0,1]:.3f} com o preço. Carros mais novos tendem a ser significativamente mais caros."
+                "content": f"A idade do carro tem uma correlação negativa forte de {precomputed['corr_all'].loc['car_age', 'log_price']:.3f} com o preço. Carros mais novos tendem a ser significativamente mais caros."
             },
             {
                 "title": "Quilometragem",
-                "content": f"Quilometragem mostra correlação negativa de {df[['quilometragem_clean', 'log_price']].corr().iloc[0,1]:.3f} com preço. Quanto mais km rodados, menor o preço."
+                "content": f"Quilometragem mostra correlação negativa de {precomputed['corr_all'].loc['quilometragem_clean', 'log_price']:.3f} com preço. Quanto mais km rodados, menor o preço."
             },
             {
                 "title": "Características de Luxo",
@@ -679,7 +933,7 @@ elif page == "Estatísticas":
             },
             {
                 "title": "Concentração Geográfica",
-                "content": f"Mais de 50% dos carros estão concentrados em apenas 3 estados: {', '.join(df['state_clean'].value_counts().head(3).index.tolist())}."
+                "content": f"Mais de 50% dos carros estão concentrados em apenas 3 estados: {', '.join(precomputed['state_counts'].head(3).index.tolist())}."
             },
             {
                 "title": "Distribuição de Preços",
@@ -697,16 +951,14 @@ elif page == "Estatísticas":
         
         with col1:
             st.write("**Top 5 Marcas por Volume:**")
-            top_5_brands = df['marca'].value_counts().head(5)
-            for brand, count in top_5_brands.items():
-                avg_price = df[df['marca'] == brand]['price_clean'].mean()
+            top_5_brands = precomputed['brand_stats'].nlargest(5, 'size')
+            for brand, count, avg_price in top_5_brands[['size', 'mean']].itertuples():
                 st.write(f"- {brand}: {count} carros, Preço médio: R$ {avg_price:,.0f}")
         
         with col2:
             st.write("**Top 5 Marcas por Preço Médio:**")
-            top_5_price = df.groupby('marca')['price_clean'].mean().sort_values(ascending=False).head(5)
-            for brand, price in top_5_price.items():
-                count = len(df[df['marca'] == brand])
+            top_5_price = precomputed['brand_stats'].nlargest(5, 'mean')
+            for brand, count, price in top_5_price[['size', 'mean']].itertuples():
                 st.write(f"- {brand}: R$ {price:,.0f} (média), {count} carros")
 
 # Footer
@@ -1,9 +1,13 @@
-import subprocess
 import sys
 import os
 
 if __name__ == "__main__":
     script_dir = os.path.dirname(os.path.abspath(__file__))
     app_path = os.path.join(script_dir, "app.py")
-    subprocess.run([sys.executable, "-m", "streamlit", "run", app_path])
-
+    # Replace this process with Streamlit instead of starting a second
+    # interpreter. The file watcher is off since the app is not edited while it
+    # is served; extra arguments are forwarded (e.g. --server.fileWatcherType=auto)
+    os.execvp(sys.executable, [
+        sys.executable, "-m", "streamlit", "run",
+        "--server.fileWatcherType=none", *sys.argv[1:], app_path
+    ])
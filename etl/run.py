@@ -2,18 +2,49 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 import re
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
+UFS_BRASIL = ['AC', 'AL', 'AM', 'AP', 'BA', 'CE', 'DF', 'ES', 'GO', 'MA', 
+              'MG', 'MS', 'MT', 'PA', 'PB', 'PE', 'PI', 'PR', 'RJ', 'RN', 
+              'RO', 'RR', 'RS', 'SC', 'SE', 'SP', 'TO']
+
+# Patterns used by the cleaning steps, compiled once at import
+_UF_RE = re.compile(r'\b(' + '|'.join(UFS_BRASIL) + r')$', re.IGNORECASE)
+_YEAR_RE = re.compile(r'(\b\d{4}\b)')
+_PRICE_RE = re.compile(r'[R$.]')
+_KM_RE = re.compile(r'[km.]')
+_MOTOR_RE = re.compile(r'(\d+\.?\d*)')
+_PORTAS_RE = re.compile(r'(\d+)')
+_WS_RE = re.compile(r'\s+')
+
+# Free-text listing attributes normalized by clean_text_columns
+TEXT_COLUMNS = ['marca', 'modelo', 'categoria', 'cor', 'combustível', 'câmbio', 'direção', 'tipo_de_veículo']
+
+# Raw columns holding free text that the cleaning steps parse themselves.
+# They are read as strings outright, so the CSV reader skips type inference
+# for them and they stay text even when a scrape only saw numeric-looking values
+RAW_TEXT_COLUMNS = [
+    'url', 'title_list', 'description', 'price_list', 'km_list', 'color_list', 'motor_list',
+    'portas', 'potência_do_motor', 'possui_kit_gnv', 'tipo_de_direção',
+    'neighborhood', 'city', 'state'
+] + TEXT_COLUMNS
+
+# Texts that mark an object column as boolean, and the value each one maps to
+BOOL_MAP = {
+    'True': True, 'true': True, '1': True,
+    'False': False, 'false': False, '0': False, '': False
+}
 
 def limpar_colunas_localizacao(df: pd.DataFrame) -> pd.DataFrame:
-    UFS_BRASIL = ['AC', 'AL', 'AM', 'AP', 'BA', 'CE', 'DF', 'ES', 'GO', 'MA', 
-                  'MG', 'MS', 'MT', 'PA', 'PB', 'PE', 'PI', 'PR', 'RJ', 'RN', 
-                  'RO', 'RR', 'RS', 'SC', 'SE', 'SP', 'TO']
-    
-    df['state_clean'] = df['state'].astype(str).str.upper().str.strip()
-    df.loc[~df['state_clean'].isin(UFS_BRASIL), 'state_clean'] = np.nan
+    # Values outside the UF categories become NaN while the Categorical is built
+    df['state_clean'] = pd.Categorical(df['state'].astype(str).str.upper().str.strip(), categories=UFS_BRASIL)
     
-    df['zip_code_clean'] = df['zip_code'].astype(str).str.replace(r'\.0$', '', regex=True)
-    df.loc[df['zip_code_clean'] == 'nan', 'zip_code_clean'] = np.nan
+    # Stored as a number, as the models use it; parsing directly also takes
+    # care of the trailing ".0" of zip codes read as floats
+    df['zip_code_clean'] = pd.to_numeric(df['zip_code'], errors='coerce')
     
     df['city_clean'] = df['city'].astype(str).str.lower().str.strip()
     df.loc[df['city_clean'] == 'nan', 'city_clean'] = np.nan
@@ -21,113 +52,121 @@ def limpar_colunas_localizacao(df: pd.DataFrame) -> pd.DataFrame:
     df['neighborhood_clean'] = df['neighborhood'].astype(str).str.lower().str.strip()
     df.loc[df['neighborhood_clean'] == 'nan', 'neighborhood_clean'] = np.nan
     
-    def try_extract_state_from_city(row):
-        if pd.isna(row['state_clean']) and pd.notna(row['city_clean']):
-            match = re.search(r'\b(' + '|'.join(UFS_BRASIL) + r')$', row['city_clean'].upper())
-            if match:
-                return match.group(1)
-        return row['state_clean']
-
-    df['state_clean'] = df.apply(try_extract_state_from_city, axis=1)
-
-    df['city_clean'] = df.apply(
-        lambda row: re.sub(r'\b' + row['state_clean'] + r'$', '', row['city_clean'], flags=re.IGNORECASE).strip()
-        if pd.notna(row['state_clean']) and pd.notna(row['city_clean']) else row['city_clean'],
-        axis=1
-    )
+    # Trailing UF token of the city name (e.g. "curitiba pr"), found for all
+    # rows in one vectorized pass
+    city_uf = df['city_clean'].str.upper().str.extract(_UF_RE, expand=False)
+    df['state_clean'] = df['state_clean'].fillna(city_uf)
+    
+    # Strip the UF from the city only where it is the row's own state
+    mask = (city_uf == df['state_clean']).fillna(False).to_numpy(dtype=bool)
+    df.loc[mask, 'city_clean'] = df.loc[mask, 'city_clean'].str.replace(_UF_RE, '', regex=True).str.strip()
     
     df = df.dropna(subset=['state_clean'])
+    # Only the states that occur remain categories
+    df['state_clean'] = df['state_clean'].cat.remove_unused_categories()
     
     return df
 
 def clean_year(df):
-    df = df.copy()
-    df['ano_limpo'] = pd.to_numeric(df.get('ano'), errors='coerce')
-    anos_do_titulo = df['title_list'].astype(str).str.extract(r'(\b\d{4}\b)', expand=False)
-    df['ano_limpo'] = df['ano_limpo'].fillna(anos_do_titulo)
-    df['ano_limpo'] = pd.to_numeric(df['ano_limpo'], errors='coerce')
+    # Years are exact in float32; the title is only searched where 'ano' is missing
+    if 'ano' in df.columns:
+        ano = pd.to_numeric(df['ano'], errors='coerce').to_numpy(dtype=np.float32)
+    else:
+        ano = np.full(len(df), np.nan, dtype=np.float32)
+    missing = np.isnan(ano)
+    if missing.any():
+        anos_do_titulo = df['title_list'][missing].astype(str).str.extract(_YEAR_RE, expand=False)
+        ano[missing] = pd.to_numeric(anos_do_titulo, errors='coerce').to_numpy(dtype=np.float32)
     
     ano_atual = datetime.now().year
-    df.loc[(df['ano_limpo'] < 1980) | (df['ano_limpo'] > (ano_atual + 1)), 'ano_limpo'] = np.nan
+    ano[(ano < 1980) | (ano > ano_atual + 1)] = np.nan
     
-    df = df.fillna({'ano_limpo': df['ano_limpo'].median()})
+    if not np.isnan(ano).all():
+        ano[np.isnan(ano)] = np.nanmedian(ano)
+    df['ano_limpo'] = ano
     return df
 
+def parse_numeric(values, low, high, strip_re=None, extract_re=None):
+    # One string pass per pattern, then a single numeric conversion; values
+    # that don't parse or fall outside [low, high] become NaN.
+    # Listings repeat the same few texts ("Motor 1.0", "4 portas"), so only
+    # the distinct values are parsed and the results are gathered back by code
+    codes, uniques = pd.factorize(values)
+    text = pd.Series(uniques).astype(str)
+    if strip_re is not None:
+        text = text.str.replace(strip_re, '', regex=True).str.replace(',', '.', regex=False).str.strip()
+    if extract_re is not None:
+        text = text.str.extract(extract_re, expand=False)
+    parsed = pd.to_numeric(text, errors='coerce').to_numpy(dtype=np.float64)
+    parsed = np.where((parsed < low) | (parsed > high), np.nan, parsed)
+    # Missing values have code -1, which picks the trailing NaN
+    return np.append(parsed, np.nan)[codes]
+
 def clean_price(df):
-    df = df.copy()
-    df['price_clean'] = df['price_list'].astype(str).str.replace(r'[R$.]', '', regex=True) \
-                                         .str.replace(',', '.', regex=False) \
-                                         .str.strip()
-    df['price_clean'] = pd.to_numeric(df['price_clean'], errors='coerce')
-    df.loc[(df['price_clean'] < 1000) | (df['price_clean'] > 1000000), 'price_clean'] = np.nan
+    df['price_clean'] = parse_numeric(df['price_list'], 1000, 1000000, strip_re=_PRICE_RE)
     return df
 
 def clean_km(df):
-    df = df.copy()
     if 'km_list' in df.columns:
-        df['km_clean'] = df['km_list'].astype(str).str.replace(r'[km.]', '', regex=True) \
-                                       .str.replace(',', '.', regex=False) \
-                                       .str.strip()
-        df['km_clean'] = pd.to_numeric(df['km_clean'], errors='coerce')
-        df.loc[(df['km_clean'] < 0) | (df['km_clean'] > 1000000), 'km_clean'] = np.nan
+        df['km_clean'] = parse_numeric(df['km_list'], 0, 1000000, strip_re=_KM_RE)
     
     if 'quilometragem' in df.columns:
-        df['quilometragem_clean'] = pd.to_numeric(df['quilometragem'], errors='coerce')
-        df.loc[(df['quilometragem_clean'] < 0) | (df['quilometragem_clean'] > 1000000), 'quilometragem_clean'] = np.nan
+        quilometragem = pd.to_numeric(df['quilometragem'], errors='coerce').to_numpy(dtype=np.float64)
+        df['quilometragem_clean'] = np.where((quilometragem < 0) | (quilometragem > 1000000), np.nan, quilometragem)
     
     return df
 
 def clean_motor(df):
-    df = df.copy()
     if 'motor_list' in df.columns:
-        df['motor_clean'] = df['motor_list'].astype(str).str.extract(r'(\d+\.?\d*)', expand=False)
-        df['motor_clean'] = pd.to_numeric(df['motor_clean'], errors='coerce')
-        df.loc[(df['motor_clean'] < 0.5) | (df['motor_clean'] > 10), 'motor_clean'] = np.nan
+        df['motor_clean'] = parse_numeric(df['motor_list'], 0.5, 10, extract_re=_MOTOR_RE)
     
     if 'potência_do_motor' in df.columns:
-        df['potencia_clean'] = df['potência_do_motor'].astype(str).str.extract(r'(\d+\.?\d*)', expand=False)
-        df['potencia_clean'] = pd.to_numeric(df['potencia_clean'], errors='coerce')
-        df.loc[(df['potencia_clean'] < 0.5) | (df['potencia_clean'] > 10), 'potencia_clean'] = np.nan
+        df['potencia_clean'] = parse_numeric(df['potência_do_motor'], 0.5, 10, extract_re=_MOTOR_RE)
     
     return df
 
 def clean_portas(df):
-    df = df.copy()
     if 'portas' in df.columns:
-        df['portas_clean'] = df['portas'].astype(str).str.extract(r'(\d+)', expand=False)
-        df['portas_clean'] = pd.to_numeric(df['portas_clean'], errors='coerce')
-        df.loc[(df['portas_clean'] < 2) | (df['portas_clean'] > 5), 'portas_clean'] = np.nan
+        df['portas_clean'] = parse_numeric(df['portas'], 2, 5, extract_re=_PORTAS_RE)
     return df
 
 def clean_text_columns(df):
-    df = df.copy()
-    text_columns = ['marca', 'modelo', 'categoria', 'cor', 'combustível', 'câmbio', 'direção', 'tipo_de_veículo']
+    for col in TEXT_COLUMNS:
+        if col in df.columns:
+            # Each distinct text is normalized once, then gathered back by code;
+            # missing values have code -1, which picks the trailing NaN
+            codes, uniques = pd.factorize(df[col])
+            texts = pd.Series(uniques).astype(str).str.strip().str.replace(_WS_RE, ' ', regex=True)
+            texts = texts.mask(texts.isin(['nan', 'None', 'NULL', '']))
+            df[col] = np.append(texts.to_numpy(dtype=object), np.nan)[codes]
     
-    for col in text_columns:
+    return df
+
+def categorize_text_columns(df):
+    # Repeated low-cardinality strings are stored once per category, which
+    # shrinks the frame and speeds up value_counts, isin and groupby
+    for col in TEXT_COLUMNS + ['state_clean']:
         if col in df.columns:
-            df[col] = df[col].astype(str).str.strip().str.replace(r'\s+', ' ', regex=True)
-            df[col] = df[col].replace(['nan', 'None', 'NULL', ''], np.nan)
+            df[col] = df[col].astype('category')
     
     return df
 
 def clean_boolean_columns(df):
-    df = df.copy()
-    boolean_columns = [col for col in df.columns if df[col].dtype == 'bool' or 
-                       (df[col].dtype == 'object' and df[col].astype(str).str.strip().isin(['True', 'False', 'true', 'false', '1', '0', '']).all())]
-    
-    for col in boolean_columns:
-        if col in df.columns:
-            df[col] = df[col].astype(str).str.strip()
-            df[col] = df[col].map({
-                'True': True, 'true': True, '1': True,
-                'False': False, 'false': False, '0': False,
-                'nan': False, 'None': False, 'NULL': False, '': False
-            }).fillna(False).astype(bool)
+    for col in df.columns:
+        # bool columns are already clean; object columns qualify when every
+        # value is a boolean text. Both checks only look at the distinct values.
+        if df[col].dtype != 'object':
+            continue
+        codes, uniques = pd.factorize(df[col])
+        texts = [str(value).strip() for value in uniques]
+        if (codes == -1).any() or not all(text in BOOL_MAP for text in texts):
+            continue
+        flags = np.array([BOOL_MAP[text] for text in texts], dtype=bool)
+        df[col] = flags[codes]
     
     return df
 
 def remove_duplicates(df):
-    df = df.copy()
     if 'url' in df.columns:
         initial_count = len(df)
         df = df.drop_duplicates(subset=['url'], keep='first')
@@ -137,8 +176,6 @@ def remove_duplicates(df):
     return df
 
 def remove_dirty_columns(df):
-    df = df.copy()
-    
     dirty_to_clean = {
         'state': 'state_clean',
         'city': 'city_clean',
@@ -164,26 +201,47 @@ def remove_dirty_columns(df):
     
     return df
 
+def is_constant(column):
+    # Same as column.nunique() <= 1, but most columns already vary within
+    # their first rows, which rules them out without hashing the whole column
+    return column.head(256).nunique() <= 1 and column.nunique() <= 1
+
+def run_column_stages(df, stages):
+    # These stages only read raw columns and add new *_clean columns, so they
+    # run concurrently on the same input; the regex and NumPy kernels release
+    # the GIL. Each gets its own shallow view to add columns to, and their
+    # columns are added back in stage order.
+    with ThreadPoolExecutor(max_workers=len(stages)) as pool:
+        futures = [pool.submit(stage, df.copy(deep=False)) for _, stage in stages]
+        results = [future.result() for future in futures]
+    
+    for (name, _), result in zip(stages, results):
+        new_columns = [col for col in result.columns if col not in df.columns]
+        df = df.assign(**{col: result[col] for col in new_columns})
+        print(f"After cleaning {name}: {df.shape}")
+    return df
+
 def clean_data(df):
     print(f"Starting data cleaning. Initial shape: {df.shape}")
     
+    # The cleaning steps modify the frame in place; a single copy up front
+    # keeps the caller's frame untouched
+    df = df.copy()
     df = remove_duplicates(df)
-    df = clean_year(df)
-    print(f"After cleaning year: {df.shape}")
-    df = clean_price(df)
-    print(f"After cleaning price: {df.shape}")
-    df = clean_km(df)
-    print(f"After cleaning mileage: {df.shape}")
-    df = clean_motor(df)
-    print(f"After cleaning motor: {df.shape}")
-    df = clean_portas(df)
-    print(f"After cleaning portas: {df.shape}")
+    df = run_column_stages(df, [
+        ('year', clean_year),
+        ('price', clean_price),
+        ('mileage', clean_km),
+        ('motor', clean_motor),
+        ('portas', clean_portas),
+    ])
     df = clean_text_columns(df)
     print(f"After cleaning text: {df.shape}")
     df = clean_boolean_columns(df)
     print(f"After cleaning boolean: {df.shape}")
     df = limpar_colunas_localizacao(df)
     print(f"After cleaning location: {df.shape}")
+    df = categorize_text_columns(df)
     
     critical_columns = ['price_clean', 'ano_limpo']
     before_drop = len(df)
@@ -192,7 +250,7 @@ def clean_data(df):
     if before_drop != after_drop:
         print(f"Removed {before_drop - after_drop} rows with missing critical data")
     
-    df.drop(columns=[col for col in df.columns if df[col].nunique() <= 1], inplace=True)
+    df.drop(columns=[col for col in df.columns if is_constant(df[col])], inplace=True)
     print(f"After removing constant columns: {df.shape}")
 
     df = remove_dirty_columns(df)
@@ -202,31 +260,61 @@ def clean_data(df):
     return df
 
 
+def read_raw_csv(input_path) -> pd.DataFrame:
+    """Read the raw scrape with pyarrow's multithreaded CSV reader.
+    
+    RAW_TEXT_COLUMNS present in the file are read as strings, with empty
+    cells as missing; listed columns the scrape did not produce are ignored.
+    Every other column is inferred as usual and converted like
+    pd.read_csv(engine='pyarrow') does: integers with blank cells become
+    float64, all-empty columns float64 and strings pandas str.
+    """
+    convert_options = pa_csv.ConvertOptions(
+        column_types={col: pa.string() for col in RAW_TEXT_COLUMNS},
+        strings_can_be_null=True
+    )
+    table = pa_csv.read_csv(input_path, convert_options=convert_options)
+    table = table.cast(pa.schema([
+        field.with_type(pa.float64()) if pa.types.is_null(field.type) else field
+        for field in table.schema
+    ]))
+    return table.to_pandas()
+
+
+def main():
+    script_dir = Path(__file__).parent
+    project_root = script_dir.parent
+    
+    input_path = project_root / 'data' / 'raw' / 'olx_cars.csv'
+    
+    if not input_path.exists():
+        raise FileNotFoundError(f"Input file not found: {input_path}")
+    
+    # Read with pyarrow directly: passing dtype= to pd.read_csv would make
+    # pandas cast the inferred integer columns back to NumPy ints, which
+    # fails on the blank cells ano, quilometragem etc. routinely have
+    df = read_raw_csv(input_path)
+    
+    if df.empty:
+        raise ValueError("O arquivo de entrada está vazio")
+    
+    df_cleaned = clean_data(df)
+    
+    if df_cleaned.empty:
+        raise ValueError("Após a limpeza, não restaram dados")
+    
+    # Parquet keeps the column dtypes (categoricals included), so later
+    # steps skip parsing text and re-inferring types
+    output_path = project_root / 'data' / 'processed' / 'olx_cars_cleaned.parquet'
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    df_cleaned.to_parquet(output_path, engine='pyarrow', compression='zstd', index=False)
+
+
 if __name__ == "__main__":
     import sys
     
     try:
-        script_dir = Path(__file__).parent
-        project_root = script_dir.parent
-        
-        input_path = project_root / 'data' / 'raw' / 'olx_cars.csv'
-        
-        if not input_path.exists():
-            raise FileNotFoundError(f"Input file not found: {input_path}")
-        
-        df = pd.read_csv(input_path)
-        
-        if df.empty:
-            raise ValueError("O arquivo de entrada está vazio")
-        
-        df_cleaned = clean_data(df)
-        
-        if df_cleaned.empty:
-            raise ValueError("Após a limpeza, não restaram dados")
-        
-        output_path = project_root / 'data' / 'processed' / 'olx_cars_cleaned.csv'
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        df_cleaned.to_csv(output_path, index=False)
+        main()
         
     except FileNotFoundError as e:
         print(f"{e}")
@@ -2,8 +2,60 @@ import pandas as pd
 import numpy as np
 import os
 
+def add_derived_columns(df):
+    """Add log_price, car_age and km_per_year to the cleaned data in place."""
+    CURRENT_YEAR = 2025
+    df['log_price'] = np.log1p(df['price_clean'])
+    # Single NumPy passes: ages at or below zero become 0.5 and non-finite
+    # mileage ratios become 0. Both features are float32, which is plenty for
+    # years and km per year and halves the memory they take
+    age = CURRENT_YEAR - df['ano_limpo'].to_numpy(dtype=np.float32)
+    car_age = np.where(age <= 0, np.float32(0.5), age)
+    
+    km = df['quilometragem_clean'].to_numpy(dtype=np.float64)
+    df['quilometragem_clean'] = km = np.where(np.isnan(km), 0.0, km)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        km_per_year = km.astype(np.float32) / car_age
+    km_per_year = np.where(np.isfinite(km_per_year), km_per_year, np.float32(0.0))
+    
+    df['car_age'], df['km_per_year'] = car_age, km_per_year
+    return df
+
+def build_dashboard_frame(input_path, output_path):
+    """Write the cleaned data plus derived columns as Parquet for the dashboard.
+    
+    The dashboard then only reads this file on cold start instead of
+    recomputing the derived columns. String columns are dictionary-encoded
+    and the file is zstd-compressed.
+    """
+    df = add_derived_columns(pd.read_parquet(input_path, engine='pyarrow'))
+    
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    df.to_parquet(output_path, engine='pyarrow', compression='zstd', use_dictionary=True, index=False)
+
+def bucket_categories(column, keep, other, missing_as_other=False):
+    """Relabel every value outside `keep` as `other`, returning a categorical.
+    
+    The relabeling is computed once per category and applied to the rows as
+    an integer code lookup. Missing values stay missing unless
+    `missing_as_other` is set.
+    """
+    column = column.astype('category')
+    categories = column.cat.categories
+    kept = [cat for cat in categories if cat in keep and cat != other]
+    new_categories = kept + [other]
+    
+    # Old category code -> new code; the extra last slot is for missing values
+    position = {cat: i for i, cat in enumerate(kept)}
+    lookup = np.array(
+        [position.get(cat, len(kept)) for cat in categories] + [len(kept) if missing_as_other else -1],
+        dtype=np.int64
+    )
+    codes = lookup[column.cat.codes.to_numpy()]
+    return pd.Series(pd.Categorical.from_codes(codes, new_categories), index=column.index, name=column.name)
+
 def build_features(input_path, output_path):
-    df = pd.read_csv(input_path)
+    df = pd.read_parquet(input_path, engine='pyarrow')
     
     if df.empty:
         raise ValueError("O DataFrame está vazio")
@@ -13,23 +65,16 @@ def build_features(input_path, output_path):
     if missing_cols:
         raise ValueError(f"Colunas necessárias não encontradas: {missing_cols}")
     
-    CURRENT_YEAR = 2025
-    df['log_price'] = np.log1p(df['price_clean'])
-    df['car_age'] = CURRENT_YEAR - df['ano_limpo']
-    df.loc[df['car_age'] <= 0, 'car_age'] = 0.5
-    
-    df['quilometragem_clean'] = df['quilometragem_clean'].fillna(0)
-    df['km_per_year'] = df['quilometragem_clean'] / df['car_age']
-    df['km_per_year'] = df['km_per_year'].replace([np.inf, -np.inf], np.nan).fillna(0)
+    add_derived_columns(df)
     
     state_counts = df['state_clean'].value_counts()
     threshold = 50 
-    rare_states = state_counts[state_counts < threshold].index
-    df['state_clean'] = df['state_clean'].replace(rare_states, 'STATE_OTHER')
+    common_states = state_counts[state_counts >= threshold].index
+    df['state_clean'] = bucket_categories(df['state_clean'], common_states, 'STATE_OTHER')
     
     brand_counts = df['marca'].value_counts()
     top_20_brands = brand_counts.head(20).index
-    df['marca'] = df['marca'].apply(lambda x: x if x in top_20_brands else 'BRAND_OTHER')
+    df['marca'] = bucket_categories(df['marca'], top_20_brands, 'BRAND_OTHER', missing_as_other=True)
     
     features_v1 = [
         'log_price',
@@ -55,23 +100,29 @@ def build_features(input_path, output_path):
     
     df_features = df[available_features]
     
+    # Categorical columns are stored as dictionaries, matching their in-memory layout
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    df_features.to_csv(output_path, index=False)
+    df_features.to_parquet(output_path, engine='pyarrow', compression='zstd', use_dictionary=True, index=False)
+
+def main():
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.dirname(script_dir)
+    
+    input_path = os.path.join(project_root, 'data', 'processed', 'olx_cars_cleaned.parquet')
+    output_path = os.path.join(project_root, 'data', 'features', 'olx_cars_features_v1.parquet')
+    dashboard_path = os.path.join(project_root, 'data', 'processed', 'olx_cars_dashboard.parquet')
+    
+    if not os.path.exists(input_path):
+        raise FileNotFoundError(f"Arquivo de entrada não encontrado: {input_path}")
+    
+    build_features(input_path, output_path)
+    build_dashboard_frame(input_path, dashboard_path)
 
 if __name__ == "__main__":
     import sys
     
     try:
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        project_root = os.path.dirname(script_dir)
-        
-        input_path = os.path.join(project_root, 'data', 'processed', 'olx_cars_cleaned.csv')
-        output_path = os.path.join(project_root, 'data', 'features', 'olx_cars_features_v1.csv')
-        
-        if not os.path.exists(input_path):
-            raise FileNotFoundError(f"Arquivo de entrada não encontrado: {input_path}")
-        
-        build_features(input_path, output_path)
+        main()
         
     except FileNotFoundError as e:
         print(f"{e}")
@@ -1,13 +1,36 @@
+import os
+import hashlib
+import inspect
 import pandas as pd
 import numpy as np
 import joblib
-import os
 from sklearn.pipeline import Pipeline
 from sklearn.impute import SimpleImputer
-from sklearn.preprocessing import OneHotEncoder
 from sklearn.compose import ColumnTransformer
+from sklearn.model_selection import train_test_split
+from threadpoolctl import threadpool_limits
+import xgboost
 from xgboost import XGBRegressor
 
+def training_threads():
+    """One thread per physical core, capped at 12.
+    
+    Hist training is memory-bound, so hyperthreads and very high thread
+    counts only add contention. Without psutil the physical core count is
+    unknown and every available CPU is used, up to the cap.
+    """
+    try:
+        import psutil
+        cores = psutil.cpu_count(logical=False)
+    except ImportError:
+        cores = None
+    if not cores:
+        try:
+            cores = len(os.sched_getaffinity(0))
+        except AttributeError:
+            cores = os.cpu_count() or 1
+    return max(1, min(cores, 12))
+
 V4_GOLDEN_PARAMS = {
     'n_estimators': 700,
     'max_depth': 5,
@@ -15,30 +38,61 @@ V4_GOLDEN_PARAMS = {
     'subsample': 0.8,
     'colsample_bytree': 0.8,
     'random_state': 42,
-    'n_jobs': -1
+    'n_jobs': training_threads(),
+    'tree_method': 'hist',
+    'enable_categorical': True
 }
 
+# Rounds without improvement on the holdout before boosting stops; 700 trees
+# is then only an upper bound
+EARLY_STOPPING_ROUNDS = 30
+
+CATEGORICAL_FEATURES = ['marca', 'state_clean', 'câmbio', 'combustível', 'direção', 'cor', 'tipo_de_veículo', 'tipo_de_direção', 'possui_kit_gnv']
+
+def training_device():
+    """'cuda' when XGBoost was built with CUDA and CuPy sees a GPU, else 'cpu'."""
+    if not xgboost.build_info().get('USE_CUDA'):
+        return 'cpu'
+    try:
+        import cupy
+        return 'cuda' if cupy.cuda.runtime.getDeviceCount() > 0 else 'cpu'
+    except Exception:
+        return 'cpu'
+
 def load_and_prep_data(project_root):
-    input_path = os.path.join(project_root, 'data', 'processed', 'olx_cars_cleaned.csv')
-    df = pd.read_csv(input_path)
+    input_path = os.path.join(project_root, 'data', 'processed', 'olx_cars_cleaned.parquet')
+    df = pd.read_parquet(input_path, engine='pyarrow')
 
     CURRENT_YEAR = 2025
     df['log_price'] = np.log1p(df['price_clean'])
     
-    df['car_age'] = CURRENT_YEAR - df['ano_limpo']
-    df.loc[df['car_age'] <= 0, 'car_age'] = 0.5
+    age = CURRENT_YEAR - df['ano_limpo'].to_numpy(dtype=np.float64)
+    df['car_age'] = car_age = np.where(age <= 0, 0.5, age)
     
-    df['quilometragem_clean'] = df['quilometragem_clean'].fillna(0)
-    df['km_per_year'] = df['quilometragem_clean'] / df['car_age']
-    df['km_per_year'] = df['km_per_year'].replace([np.inf, -np.inf], np.nan).fillna(0)
+    # Missing mileage counts as zero; filled on the array the ratio reads
+    km = df['quilometragem_clean'].to_numpy(dtype=np.float64)
+    df['quilometragem_clean'] = km = np.where(np.isnan(km), 0.0, km)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        km_per_year = km / car_age
+    df['km_per_year'] = np.where(np.isfinite(km_per_year), km_per_year, 0.0)
 
-    state_counts = df['state_clean'].value_counts()
-    rare_states = state_counts[state_counts < 50].index
-    df['state_clean'] = df['state_clean'].replace(rare_states, 'STATE_OTHER')
+    # Counts only need a hash pass; no ordering is required for a threshold
+    state_counts = df['state_clean'].value_counts(sort=False)
+    rare_states = state_counts.index[state_counts.to_numpy() < 50]
+    # np.where rather than mask/where: the categoricals read from Parquet
+    # cannot take the new bucket label in place
+    df['state_clean'] = np.where(df['state_clean'].isin(rare_states), 'STATE_OTHER', df['state_clean'])
 
-    brand_counts = df['marca'].value_counts()
-    top_20_brands = brand_counts.head(20).index
-    df['marca'] = df['marca'].apply(lambda x: x if x in top_20_brands else 'BRAND_OTHER')
+    # Brands counted and matched on their category codes; the stable sort
+    # breaks ties in category order like value_counts().head(20)
+    brand_codes = df['marca'].cat.codes.to_numpy()
+    brand_counts = np.bincount(brand_codes[brand_codes >= 0], minlength=len(df['marca'].cat.categories))
+    top_20_codes = np.argsort(-brand_counts, kind='stable')[:20]
+    df['marca'] = np.where(np.isin(brand_codes, top_20_codes), df['marca'], 'BRAND_OTHER')
+    
+    # XGBoost splits on the category codes directly, so no one-hot columns are built
+    categorical_features = [col for col in CATEGORICAL_FEATURES if col in df.columns]
+    df[categorical_features] = df[categorical_features].astype('category')
 
     y = df['log_price']
     
@@ -47,6 +101,11 @@ def load_and_prep_data(project_root):
     
     valid_cols_to_drop = [col for col in cols_to_drop if col in df.columns]
     X = df.drop(columns=valid_cols_to_drop)
+    # XGBoost bins float32 values, so 64-bit inputs only double the memory
+    # traffic (and are copied down internally); bools are already one byte.
+    # Integer features become float32 too, so the numeric block the imputer
+    # fills stays float32 instead of being promoted to float64
+    X = X.astype({col: 'float32' for col in X.select_dtypes(['float64', 'int64']).columns})
     
     return X, y, X.columns
 
@@ -55,53 +114,110 @@ def build_preprocessor(X_columns, X_sample=None):
     
     numeric_features = [col for col in ['car_age', 'km_per_year', 'motor_clean', 'quilometragem_clean', 'final_de_placa', 'portas_clean', 'potencia_clean', 'zip_code_clean'] if col in all_cols]
     
-    categorical_features = [col for col in ['marca', 'state_clean', 'câmbio', 'combustível', 'direção', 'cor', 'tipo_de_veículo', 'tipo_de_direção', 'possui_kit_gnv'] if col in all_cols]
+    categorical_features = [col for col in CATEGORICAL_FEATURES if col in all_cols]
     
     bool_candidates = [col for col in all_cols if col not in numeric_features and col not in categorical_features]
     
     if X_sample is not None:
-        boolean_features = [col for col in bool_candidates if X_sample[col].dtype == 'bool']
+        # Dtypes looked up once for all candidates instead of a column access each
+        dtypes = X_sample.dtypes
+        boolean_features = [col for col in bool_candidates if dtypes[col] == bool]
     else:
         boolean_features = bool_candidates
 
+    # The fitted medians stay in the pipeline, where the API reads them for
+    # serving; copy=False fills the column block in place instead of copying it
     numeric_transformer = Pipeline(steps=[
-        ('imputer', SimpleImputer(strategy='median'))
-    ])
-    categorical_transformer = Pipeline(steps=[
-        ('imputer', SimpleImputer(strategy='most_frequent')),
-        ('onehot', OneHotEncoder(handle_unknown='ignore', sparse_output=False))
+        ('imputer', SimpleImputer(strategy='median', copy=False))
     ])
 
+    # Categoricals pass through as pandas categories (missing values included)
+    # and are handled natively by XGBoost; pandas output keeps their dtype
     preprocessor = ColumnTransformer(
         transformers=[
             ('num', numeric_transformer, numeric_features),
-            ('cat', categorical_transformer, categorical_features),
+            ('cat', 'passthrough', categorical_features),
             ('bool', 'passthrough', boolean_features)
-        ])
+        ],
+        verbose_feature_names_out=False
+    ).set_output(transform='pandas')
     
     return preprocessor
 
+def prepare_training_matrix(project_root, data_mtime, code_key):
+    """Load the training data and fit the preprocessor on it.
+    
+    Returns the fitted preprocessor, the transformed features and the target.
+    `data_mtime` (the cleaned data's modification time) and `code_key` (see
+    preprocessing_code_key) are only there to key the on-disk cache in main,
+    so changed input or feature code is preprocessed again.
+    """
+    X_full, y_full, X_columns = load_and_prep_data(project_root)
+    preprocessor = build_preprocessor(X_columns, X_sample=X_full)
+    X_trans = preprocessor.fit_transform(X_full)
+    return preprocessor, X_trans, y_full
+
+def preprocessing_code_key():
+    """Hash of the code and settings that build the training matrix.
+    
+    joblib only hashes the cached function's own source, not the functions
+    and globals it uses, so these are hashed here and passed as an argument.
+    """
+    source = ''.join(inspect.getsource(func) for func in (load_and_prep_data, build_preprocessor))
+    return hashlib.sha256((source + repr(CATEGORICAL_FEATURES)).encode('utf-8')).hexdigest()
+
+def early_stopping_n_estimators(X_trans, y, device):
+    """Number of boosting rounds, found by early stopping on a 20% holdout."""
+    X_train, X_val, y_train, y_val = train_test_split(
+        X_trans, y, test_size=0.2, random_state=V4_GOLDEN_PARAMS['random_state']
+    )
+    model = XGBRegressor(**V4_GOLDEN_PARAMS, device=device, early_stopping_rounds=EARLY_STOPPING_ROUNDS)
+    model.fit(X_train, y_train, eval_set=[(X_val, y_val)], verbose=False)
+    return model.best_iteration + 1
+
 def main():
     script_dir = os.path.dirname(os.path.abspath(__file__))
     project_root = os.path.dirname(script_dir)
     
-    X_full, y_full, X_columns = load_and_prep_data(project_root)
-    
-    preprocessor = build_preprocessor(X_columns, X_sample=X_full)
-    
+    # Loading and preprocessing run once per version of the cleaned data and
+    # feature code; later fits reuse the cached matrix and only train the model
+    data_path = os.path.join(project_root, 'data', 'processed', 'olx_cars_cleaned.parquet')
+    cache_dir = os.environ.get('TRAINING_CACHE_DIR', os.path.join(script_dir, '.cache'))
+    memory = joblib.Memory(cache_dir, verbose=0)
+    preprocessor, X_trans, y_full = memory.cache(prepare_training_matrix)(
+        project_root, os.path.getmtime(data_path), preprocessing_code_key()
+    )
+    # Only the matrix just used is kept; older versions would never be hit again
+    memory.reduce_size(items_limit=1)
+    
+    # Histogram building runs on the GPU when one is available
+    device = training_device()
+    # XGBoost takes its thread count from n_jobs; the BLAS/OpenMP pools that
+    # NumPy and pandas already loaded are capped the same way for the fits
+    with threadpool_limits(limits=V4_GOLDEN_PARAMS['n_jobs']):
+        # The final model is refit on all the data with the round count that
+        # early stopping picked on the holdout
+        n_estimators = early_stopping_n_estimators(X_trans, y_full, device)
+        print(f"Early stopping: {n_estimators} de {V4_GOLDEN_PARAMS['n_estimators']} árvores")
+        model = XGBRegressor(**{**V4_GOLDEN_PARAMS, 'n_estimators': n_estimators}, device=device)
+        model.fit(X_trans, y_full)
+    if device != 'cpu':
+        # The API predicts on CPU; a saved CUDA device would warn and fall back on every load
+        model.set_params(device='cpu')
+    
+    # Saved as the usual preprocessor + model pipeline, both already fitted
     model_pipeline = Pipeline(steps=[
         ('preprocessor', preprocessor),
-        ('model', XGBRegressor(**V4_GOLDEN_PARAMS))
+        ('model', model)
     ])
     
-    model_pipeline.fit(X_full, y_full)
-    
     output_path_v1 = os.path.join(project_root, 'models', 'price_predictor_v1.pkl')
     output_path_v4 = os.path.join(project_root, 'models', 'price_predictor_v4.pkl')
     os.makedirs(os.path.dirname(output_path_v1), exist_ok=True)
     
-    joblib.dump(model_pipeline, output_path_v1)
-    joblib.dump(model_pipeline, output_path_v4)
+    # Uncompressed so the API can memory-map the model's arrays
+    joblib.dump(model_pipeline, output_path_v1, compress=0)
+    joblib.dump(model_pipeline, output_path_v4, compress=0)
 
 if __name__ == "__main__":
     main()
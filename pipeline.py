@@ -1,6 +1,7 @@
 import sys
 import argparse
 import subprocess
+import traceback
 from pathlib import Path
 
 project_root = Path(__file__).parent
@@ -59,74 +60,45 @@ def run_etl():
         return False
     
     try:
-        script_path = project_root / "etl" / "run.py"
-        if not script_path.exists():
-            print(f"Script não encontrado: {script_path}")
-            return False
-        
-        subprocess.run(
-            [sys.executable, str(script_path)],
-            cwd=str(project_root),
-            check=True
-        )
+        # Run in this process, so the libraries are imported once per pipeline
+        from etl import run as etl_run
+        etl_run.main()
         return True
-    except subprocess.CalledProcessError as e:
-        print(f"Erro ao executar ETL: {e}")
-        return False
     except Exception as e:
-        print(f"Erro inesperado no ETL: {e}")
+        print(f"Erro ao executar ETL: {e}")
+        traceback.print_exc()
         return False
 
 
 def run_features():
-    input_file = project_root / "data" / "processed" / "olx_cars_cleaned.csv"
+    input_file = project_root / "data" / "processed" / "olx_cars_cleaned.parquet"
     if not check_file_exists(input_file, "Features"):
         print("Execute primeiro o ETL: python pipeline.py etl")
         return False
     
     try:
-        script_path = project_root / "feature" / "run.py"
-        if not script_path.exists():
-            print(f"Script não encontrado: {script_path}")
-            return False
-        
-        subprocess.run(
-            [sys.executable, str(script_path)],
-            cwd=str(project_root),
-            check=True
-        )
+        from feature import run as feature_run
+        feature_run.main()
         return True
-    except subprocess.CalledProcessError as e:
-        print(f"Erro ao executar feature engineering: {e}")
-        return False
     except Exception as e:
-        print(f"Erro inesperado na engenharia de features: {e}")
+        print(f"Erro ao executar feature engineering: {e}")
+        traceback.print_exc()
         return False
 
 
 def run_train():
-    input_file = project_root / "data" / "processed" / "olx_cars_cleaned.csv"
+    input_file = project_root / "data" / "processed" / "olx_cars_cleaned.parquet"
     if not check_file_exists(input_file, "Train"):
         print("Execute primeiro o ETL: python pipeline.py etl")
         return False
     
     try:
-        script_path = project_root / "models" / "run.py"
-        if not script_path.exists():
-            print(f"Script não encontrado: {script_path}")
-            return False
-        
-        subprocess.run(
-            [sys.executable, str(script_path)],
-            cwd=str(project_root),
-            check=True
-        )
+        from models import run as models_run
+        models_run.main()
         return True
-    except subprocess.CalledProcessError as e:
-        print(f"Erro ao executar treinamento: {e}")
-        return False
     except Exception as e:
-        print(f"Erro inesperado no treinamento: {e}")
+        print(f"Erro ao executar treinamento: {e}")
+        traceback.print_exc()
         return False
 
 
@@ -1,93 +1,117 @@
-from playwright.sync_api import sync_playwright
-import time
-import pandas as pd
+from playwright.async_api import async_playwright
+import asyncio
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+import os
+import shutil
 import random
 import logging
 import unicodedata
+import re
+from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
 URL_TARGET = "https://www.olx.com.br/autos-e-pecas/carros-vans-e-utilitarios"
 NUM_PAGES = 100
+# Browser contexts scraping at the same time; each one keeps its own pauses
+# between requests, so throughput grows with the count at the same per-context rate
+NUM_WORKERS = 8
+# Resource types the scraper never reads; they are aborted before download
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font", "stylesheet"}
+# Cars with their details are saved here in Parquet parts of CHECKPOINT_BATCH
+# cars, so an interrupted scrape resumes without visiting them again
+CHECKPOINT_DIR = "data/raw/olx_cars_checkpoint"
+CHECKPOINT_BATCH = 50
+
+# Patterns used by normalize_option_name, compiled once at import
+_COMBINING_MARKS_RE = re.compile('[\u0300-\u036f]')
+_NON_ALNUM_RE = re.compile(r'[\W_]+')
+
+LISTING_CARD_SELECTOR = "div[class^='olx-adcard__content']"
+# (field, selector inside the ad card, attribute to read or None for the text)
+LISTING_FIELDS = [
+    ("url", "a", "href"),
+    ("title_list", "h2[class^='typo-body-large']", None),
+    ("km_list", "[aria-label$='quilômetros rodados']", None),
+    ("color_list", "[aria-label^='Cor']", None),
+    ("motor_list", "[aria-label^='Motor']", None),
+    ("price_list", "h3[class^='typo-body-large']", None),
+]
+
+# Reads LISTING_FIELDS from every ad card inside the browser; missing
+# elements give null
+EXTRACT_LISTINGS_JS = """
+([cardSelector, fields]) => Array.from(document.querySelectorAll(cardSelector), card => {
+    const data = {};
+    for (const [field, selector, attribute] of fields) {
+        const element = card.querySelector(selector);
+        if (element === null) {
+            data[field] = null;
+        } else {
+            data[field] = attribute ? element.getAttribute(attribute) : element.innerText.trim();
+        }
+    }
+    return data;
+})
+"""
 
 
-def safe_query(element, selector, method="inner_text"):
-    """Safely query an element and return its text or attribute."""
-    try:
-        res = element.query_selector(selector)
-        if res is None:
-            return None
-        if method == "inner_text":
-            return res.inner_text().strip()
-        elif method == "get_attribute":
-            return res.get_attribute("href")
-    except Exception:
-        return None
+async def extract_car_listings(page):
+    """Extract the data of every car listing on the page in a single evaluate call."""
+    fields = [list(field) for field in LISTING_FIELDS]
+    return await page.evaluate(EXTRACT_LISTINGS_JS, [LISTING_CARD_SELECTOR, fields])
 
-def extract_car_listing_data(car_element):
-    """Extract data from a single car listing element."""
-    url = safe_query(car_element, "a", method="get_attribute")
-    title = safe_query(car_element, "h2[class^='typo-body-large']")
-    km = safe_query(car_element, "[aria-label$='quilômetros rodados']")
-    color = safe_query(car_element, "[aria-label^='Cor']")
-    motor = safe_query(car_element, "[aria-label^='Motor']")
-    price = safe_query(car_element, "h3[class^='typo-body-large']")
-    
-    return {
-        "url": url,
-        "title_list": title,
-        "km_list": km,
-        "color_list": color,
-        "motor_list": motor,
-        "price_list": price
-    }
 
-
-def scrape_listings_from_page(page, page_number):
+async def scrape_listings_from_page(page, page_number):
     """Scrape all car listings from a single page."""
     url = f"{URL_TARGET}?o={page_number}"
     logger.info(f"[Página {page_number}/{NUM_PAGES}] Iniciando scraping da página")
 
     try:
-        page.goto(url, wait_until="domcontentloaded")
+        await page.goto(url, wait_until="domcontentloaded")
         logger.debug(f"[Página {page_number}/{NUM_PAGES}] Página carregada com sucesso")
     except Exception as e:
         logger.error(f"[Página {page_number}/{NUM_PAGES}] Erro ao carregar página: {e}")
         return []
 
-    car_elements = page.query_selector_all("div[class^='olx-adcard__content']")
-    logger.info(f"[Página {page_number}/{NUM_PAGES}] Encontrados {len(car_elements)} anúncios")
+    try:
+        car_data = await extract_car_listings(page)
+    except Exception as e:
+        logger.error(f"[Página {page_number}/{NUM_PAGES}] Erro ao extrair anúncios: {e}")
+        car_data = []
+    logger.info(f"[Página {page_number}/{NUM_PAGES}] Encontrados {len(car_data)} anúncios")
 
-    car_data = []
-    for idx, car_element in enumerate(car_elements, 1):
-        listing_data = extract_car_listing_data(car_element)
-        car_data.append(listing_data)
+    for idx, listing_data in enumerate(car_data, 1):
         title = listing_data.get('title_list', 'Sem título')
-        logger.debug(f"[Página {page_number}] Anúncio {idx}/{len(car_elements)}: {title}")
+        logger.debug(f"[Página {page_number}] Anúncio {idx}/{len(car_data)}: {title}")
     
     sleep_time = random.uniform(2, 5)
     logger.debug(f"[Página {page_number}] Aguardando {sleep_time:.2f}s antes da próxima página")
-    time.sleep(sleep_time)
+    await asyncio.sleep(sleep_time)
     return car_data
 
 
-def scrape_olx_list(page):
+async def scrape_olx_list(browser):
     """Scrape car listings from multiple pages."""
-    logger.info(f"[Listagens] Iniciando scraping de {NUM_PAGES} página(s)")
-    car_data = []
+    logger.info(f"[Listagens] Iniciando scraping de {NUM_PAGES} página(s) com {NUM_WORKERS} contexto(s)")
 
-    for page_number in range(1, NUM_PAGES + 1):
-        page_listings = scrape_listings_from_page(page, page_number)
-        car_data.extend(page_listings)
+    async def scrape_page(page, page_number):
+        page_listings = await scrape_listings_from_page(page, page_number)
         logger.info(f"[Listagens] Página {page_number} processada: {len(page_listings)} anúncios coletados")
+        return page_listings
+
+    pages = await run_page_workers(browser, range(1, NUM_PAGES + 1), scrape_page)
+    car_data = [listing for page_listings in pages for listing in page_listings]
 
     logger.info(f"[Listagens] Concluído. Total de anúncios encontrados: {len(car_data)}")
     return car_data
 
-def extract_description(page):
+async def extract_description(page):
     """Extract description from car details page."""
     try:
-        descricao_element = page.locator('[data-section="description"]').inner_text(timeout=5000)
+        descricao_element = await page.locator('[data-section="description"]').inner_text(timeout=5000)
         logger.debug("[Detalhes] Descrição extraída com sucesso")
         return descricao_element
     except Exception as e:
@@ -95,71 +119,71 @@ def extract_description(page):
         return None
 
 
-def extract_car_details(page):
+# (label, value) texts of every technical detail row; the value is the last
+# span or link of the row's value container, null where either is missing
+DETAIL_ROWS_JS = """
+rows => rows.map(row => {
+    const label = row.querySelector('span[data-variant="overline"]');
+    const container = row.querySelector('div[class^="ad__sc-2h9gkk-1"]');
+    const values = container ? container.querySelectorAll('span:not([data-variant="overline"]), a') : [];
+    return [label ? label.innerText : null, values.length ? values[values.length - 1].innerText : null];
+})
+"""
+
+
+async def extract_car_details(page):
     """Extract technical details from car details page."""
     details = {}
     try:
-        car_details_element = page.locator('#details [data-ds-component="DS-Container"]').all()
-        logger.debug(f"[Detalhes] Encontrados {len(car_details_element)} elementos de detalhes")
+        # All rows are read in one round trip; keys are normalized here
+        rows = await page.locator('#details [data-ds-component="DS-Container"]').evaluate_all(DETAIL_ROWS_JS)
+        logger.debug(f"[Detalhes] Encontrados {len(rows)} elementos de detalhes")
         
-        for detail in car_details_element:
-            try:
-                key_span = detail.locator('span[data-variant="overline"]').first
-                key = key_span.inner_text(timeout=2000)
-
-                valor_container = detail.locator('div[class^="ad__sc-2h9gkk-1"]').first
-                valor_span_a = valor_container.locator('span:not([data-variant="overline"]), a').last
-                valor = valor_span_a.inner_text(timeout=2000)
-
-                if key and valor:
-                    key = key.lower().replace(" ", "_")
-                    details[key] = valor
-                    logger.debug(f"[Detalhes] Extraído: {key} = {valor}")
-            except Exception as e:
-                logger.debug(f"[Detalhes] Falha ao extrair detalhe individual: {e}")
-                continue
+        for key, valor in rows:
+            if key and valor:
+                key = key.lower().replace(" ", "_")
+                details[key] = valor
+                logger.debug(f"[Detalhes] Extraído: {key} = {valor}")
     except Exception as e:
         logger.warning(f"[Detalhes] Falha ao extrair detalhes do carro: {e}")
     
     return details
 
 
+# Listings repeat the same small set of option names, so each distinct text
+# is normalized once
+@lru_cache(maxsize=4096)
 def normalize_option_name(option_text):
     """Normalize option name by removing accents and special characters."""
-    # Normalize the option name: remove accents and convert to lowercase
-    normalized_key = unicodedata.normalize('NFD', option_text.lower())
-    normalized_key = ''.join(c for c in normalized_key if unicodedata.category(c) != 'Mn')
-    # Replace spaces with underscores
-    normalized_key = normalized_key.replace(" ", "_")
-    # Remove special characters, keep only alphanumeric and underscores
-    normalized_key = ''.join(c if c.isalnum() or c == '_' else '_' for c in normalized_key)
-    # Remove multiple consecutive underscores
-    while '__' in normalized_key:
-        normalized_key = normalized_key.replace('__', '_')
-    return normalized_key.strip('_')
-
-
-def extract_car_options(page):
+    # Decompose accented letters and drop the combining accents
+    normalized_key = _COMBINING_MARKS_RE.sub('', unicodedata.normalize('NFD', option_text.lower()))
+    # Runs of anything but letters and digits (spaces included) become one underscore
+    return _NON_ALNUM_RE.sub('_', normalized_key).strip('_')
+
+
+async def extract_car_options(page):
     """Extract car options/features from car details page."""
     options = {}
-    car_options_element = page.locator('div[class^="ad__sc-1jr3zuf-1"]').all()
-    logger.debug(f"[Opcionais] Encontrados {len(car_options_element)} elementos de opcionais")
+    try:
+        # Texts of all option elements in one round trip
+        option_elements_text = await page.locator('div[class^="ad__sc-1jr3zuf-1"]').evaluate_all(
+            "elements => elements.map(element => element.innerText)"
+        )
+    except Exception as e:
+        logger.warning(f"[Opcionais] Falha ao extrair opcionais: {e}")
+        return options
+    logger.debug(f"[Opcionais] Encontrados {len(option_elements_text)} elementos de opcionais")
     
-    for option in car_options_element:
-        try:
-            key_span = option.inner_text(timeout=2000)
-            if key_span:
-                # Split by newlines in case multiple options are concatenated
-                option_texts = [opt.strip() for opt in key_span.split('\n') if opt.strip()]
-                
-                for opt_text in option_texts:
-                    normalized_key = normalize_option_name(opt_text)
-                    if normalized_key:
-                        options[normalized_key] = True
-                        logger.debug(f"[Opcionais] Opcional encontrado: {opt_text} -> {normalized_key}")
-        except Exception as e:
-            logger.debug(f"[Opcionais] Falha ao extrair opcional: {e}")
-            continue
+    for key_span in option_elements_text:
+        if key_span:
+            # Split by newlines in case multiple options are concatenated
+            option_texts = [opt.strip() for opt in key_span.split('\n') if opt.strip()]
+            
+            for opt_text in option_texts:
+                normalized_key = normalize_option_name(opt_text)
+                if normalized_key:
+                    options[normalized_key] = True
+                    logger.debug(f"[Opcionais] Opcional encontrado: {opt_text} -> {normalized_key}")
     
     logger.debug(f"[Opcionais] Total de opcionais extraídos: {len(options)}")
     return options
@@ -186,7 +210,7 @@ def parse_location_string(location_string):
     return city, state, zip_code
 
 
-def extract_location(page):
+async def extract_location(page):
     """Extract location information from car details page."""
     location_data = {
         'neighborhood': None,
@@ -200,7 +224,7 @@ def extract_location(page):
 
         # Extract neighborhood
         try:
-            neighborhood = location_element.locator("span.olx-text--body-medium").inner_text(timeout=2000)
+            neighborhood = await location_element.locator("span.olx-text--body-medium").inner_text(timeout=2000)
             location_data['neighborhood'] = neighborhood
             logger.debug(f"[Localização] Bairro extraído: {neighborhood}")
         except Exception:
@@ -208,7 +232,7 @@ def extract_location(page):
 
         # Extract city, state, zip code
         try:
-            city_state_zip_raw = location_element.locator("span.olx-text--body-small").inner_text(timeout=2000)
+            city_state_zip_raw = await location_element.locator("span.olx-text--body-small").inner_text(timeout=2000)
             city, state, zip_code = parse_location_string(city_state_zip_raw)
             location_data['city'] = city
             location_data['state'] = state
@@ -222,12 +246,12 @@ def extract_location(page):
     return location_data
 
 
-def scrape_car_details(page, url):
+async def scrape_car_details(page, url):
     """Scrape all details from a car details page."""
     logger.debug(f"[Detalhes] Iniciando scraping de detalhes: {url}")
     
     try:
-        page.goto(url, wait_until="domcontentloaded", timeout=30000)
+        await page.goto(url, wait_until="domcontentloaded", timeout=30000)
         logger.debug("[Detalhes] Página de detalhes carregada com sucesso")
     except Exception as e:
         logger.warning(f"[Detalhes] Falha ao navegar para página de detalhes {url}: {e}")
@@ -236,109 +260,241 @@ def scrape_car_details(page, url):
     all_data = {}
     
     # Extract description
-    all_data["description"] = extract_description(page)
+    all_data["description"] = await extract_description(page)
     
     # Extract technical details
-    details = extract_car_details(page)
+    details = await extract_car_details(page)
     all_data.update(details)
     
     # Extract car options
-    options = extract_car_options(page)
+    options = await extract_car_options(page)
     all_data.update(options)
     
     # Extract location
-    location = extract_location(page)
+    location = await extract_location(page)
     all_data.update(location)
     
     logger.debug(f"[Detalhes] Scraping concluído: {len(all_data)} campos extraídos")
     return all_data
 
-def create_browser_context(playwright):
-    """Create and configure browser context."""
+async def launch_browser(playwright):
+    """Launch the headless Chromium browser shared by all contexts."""
     logger.info("[Browser] Inicializando navegador Chromium")
-    browser = playwright.chromium.launch(headless=True)
-    context = browser.new_context(
+    browser = await playwright.chromium.launch(headless=True)
+    logger.info("[Browser] Navegador inicializado com sucesso")
+    return browser
+
+
+async def block_unused_resources(route):
+    """Abort requests for images, media, fonts and stylesheets."""
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+async def create_browser_context(browser):
+    """Create and configure browser context."""
+    context = await browser.new_context(
         user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
         viewport={"width": 1920, "height": 1080}
     )
-    page = context.new_page()
-    logger.info("[Browser] Navegador inicializado com sucesso")
-    return browser, page
+    # Only the DOM text is scraped, so page loads skip the heavy assets
+    await context.route("**/*", block_unused_resources)
+    page = await context.new_page()
+    return context, page
+
+
+async def run_page_workers(browser, items, handle):
+    """Run `handle(page, item)` for every item on up to NUM_WORKERS pages.
+    
+    Each worker owns a browser context and takes the next item from a shared
+    queue when it is done with the previous one. Results are returned in
+    item order.
+    """
+    queue = asyncio.Queue()
+    for position, item in enumerate(items):
+        queue.put_nowait((position, item))
+    results = [None] * queue.qsize()
+
+    async def worker():
+        context, page = await create_browser_context(browser)
+        try:
+            while not queue.empty():
+                position, item = queue.get_nowait()
+                results[position] = await handle(page, item)
+        finally:
+            await context.close()
 
+    await asyncio.gather(*(worker() for _ in range(min(NUM_WORKERS, len(results)))))
+    return results
 
-def scrape_cars_details_batch(page, car_data):
+
+def drop_seen_urls(car_data, seen_urls):
+    """Keep the first listing of each URL not in `seen_urls`, plus listings without a URL.
+    
+    Ads shift between pages while the listings are scraped, so the same car
+    can be listed twice; its details are only fetched once. `seen_urls` is
+    updated in place.
+    """
+    unique_cars = []
+    for car in car_data:
+        url = car["url"]
+        if url in seen_urls:
+            continue
+        if url:
+            seen_urls.add(url)
+        unique_cars.append(car)
+    
+    skipped = len(car_data) - len(unique_cars)
+    if skipped:
+        logger.info(f"[Listagens] {skipped} anúncio(s) repetido(s) ou já coletado(s) ignorado(s)")
+    return unique_cars
+
+
+async def scrape_cars_details_batch(browser, car_data):
     """Scrape details for a batch of cars."""
     total_cars = len(car_data)
     logger.info(f"[Detalhes] Iniciando scraping de detalhes para {total_cars} carro(s)")
     
+    cars_with_url = []
     for idx, car in enumerate(car_data, 1):
         if car["url"]:
-            title = car.get('title_list', 'Sem título')
-            logger.info(f"[Detalhes] Processando carro {idx}/{total_cars}: {title}")
-            car_details = scrape_car_details(page, car["url"])
-            car.update(car_details)
-            sleep_time = random.uniform(2, 3)
-            logger.debug(f"[Detalhes] Aguardando {sleep_time:.2f}s antes do próximo carro")
-            time.sleep(sleep_time)
+            cars_with_url.append((idx, car))
         else:
             logger.warning(f"[Detalhes] Carro {idx}/{total_cars} não possui URL, pulando scraping de detalhes")
     
+    finished = []
+    
+    async def scrape_car(page, indexed_car):
+        idx, car = indexed_car
+        title = car.get('title_list', 'Sem título')
+        logger.info(f"[Detalhes] Processando carro {idx}/{total_cars}: {title}")
+        car_details = await scrape_car_details(page, car["url"])
+        car.update(car_details)
+        # Cars whose page failed to load stay out of the checkpoint, so a
+        # resumed run fetches their details again
+        if car_details:
+            finished.append(car)
+        if len(finished) >= CHECKPOINT_BATCH:
+            write_checkpoint(finished)
+            finished.clear()
+        sleep_time = random.uniform(2, 3)
+        logger.debug(f"[Detalhes] Aguardando {sleep_time:.2f}s antes do próximo carro")
+        await asyncio.sleep(sleep_time)
+    
+    await run_page_workers(browser, cars_with_url, scrape_car)
+    if finished:
+        write_checkpoint(finished)
+    
     logger.info(f"[Detalhes] Scraping de detalhes concluído para {total_cars} carro(s)")
     return car_data
 
 
-def scrape_olx():
-    """Main function to scrape OLX car listings and details."""
-    logger.info("=" * 60)
-    logger.info("[OLX Scraper] Iniciando processo de scraping")
-    logger.info("=" * 60)
+async def scrape_olx_async():
+    """Scrape listings and then details, NUM_WORKERS pages at a time.
+    
+    Cars already in the checkpoint of an interrupted run are reused instead
+    of having their details scraped again.
+    """
+    saved_cars = load_checkpoint()
+    if saved_cars:
+        logger.info(f"[Checkpoint] {len(saved_cars)} carro(s) recuperado(s) de uma execução anterior")
+    seen_urls = {car.get("url") for car in saved_cars}
     
-    with sync_playwright() as p:
-        browser, page = create_browser_context(p)
+    async with async_playwright() as p:
+        browser = await launch_browser(p)
         
         try:
             # Scrape listings
-            car_data = scrape_olx_list(page)
+            car_data = await scrape_olx_list(browser)
+            car_data = drop_seen_urls(car_data, seen_urls)
             
             # Scrape details for each car
-            car_data = scrape_cars_details_batch(page, car_data)
+            car_data = await scrape_cars_details_batch(browser, car_data)
         finally:
             logger.info("[Browser] Fechando navegador")
-            browser.close()
+            await browser.close()
+    
+    return saved_cars + car_data
+
+
+def scrape_olx():
+    """Main function to scrape OLX car listings and details."""
+    logger.info("=" * 60)
+    logger.info("[OLX Scraper] Iniciando processo de scraping")
+    logger.info("=" * 60)
+    
+    car_data = asyncio.run(scrape_olx_async())
 
     logger.info("=" * 60)
     logger.info(f"[OLX Scraper] Processo concluído. Total de carros coletados: {len(car_data)}")
     logger.info("=" * 60)
     return car_data
 
+def to_arrow_column(values):
+    """Arrow array for one scraped column; mixed-type columns are stored as text."""
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.array([None if value is None else str(value) for value in values], type=pa.string())
+
+
+def records_to_table(records, option_keys=frozenset()):
+    """Arrow table of scraped records, built column by column without copying them.
+    
+    Columns are in order of first appearance. A record without a column gets
+    False for option keys and null otherwise.
+    """
+    columns = list(dict.fromkeys(key for record in records for key in record))
+    return pa.table({
+        column: to_arrow_column([record.get(column, False if column in option_keys else None) for record in records])
+        for column in columns
+    })
+
+
+def write_checkpoint(records):
+    """Append finished cars to the checkpoint as a new Parquet part."""
+    os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+    part = sum(name.endswith(".parquet") for name in os.listdir(CHECKPOINT_DIR))
+    path = os.path.join(CHECKPOINT_DIR, f"part-{part:05d}.parquet")
+    # Written under a temporary name, so an interruption never leaves a partial part
+    pq.write_table(records_to_table(records), path + ".tmp")
+    os.replace(path + ".tmp", path)
+    logger.debug(f"[Checkpoint] {len(records)} carro(s) salvos em {path}")
+
+
+def load_checkpoint():
+    """Cars saved by an interrupted run, as records without their null fields."""
+    if not os.path.isdir(CHECKPOINT_DIR):
+        return []
+    records = []
+    for name in sorted(os.listdir(CHECKPOINT_DIR)):
+        if name.endswith(".parquet"):
+            for row in pq.read_table(os.path.join(CHECKPOINT_DIR, name)).to_pylist():
+                records.append({key: value for key, value in row.items() if value is not None})
+    return records
+
+
+def clear_checkpoint():
+    """Remove the checkpoint once the scraped data has been saved."""
+    shutil.rmtree(CHECKPOINT_DIR, ignore_errors=True)
+
+
 def save_data(data):
     """Save scraped data to CSV file."""
     total_records = len(data)
     logger.info(f"[Salvamento] Salvando {total_records} registro(s) em CSV")
     
     try:
-        # First, collect all option keys (keys with True values)
-        all_option_keys = set()
-        for record in data:
-            for key, value in record.items():
-                if value is True:
-                    all_option_keys.add(key)
-        
-        # Ensure all records have all option columns
-        normalized_data = []
-        for record in data:
-            normalized_record = record.copy()
-            # Set all option keys to False if not present
-            for option_key in all_option_keys:
-                if option_key not in normalized_record:
-                    normalized_record[option_key] = False
-            normalized_data.append(normalized_record)
-        
-        df = pd.DataFrame(normalized_data)
+        # Option keys are those with a True value somewhere; they default to
+        # False for the other cars
+        all_option_keys = {key for record in data for key, value in record.items() if value is True}
+        table = records_to_table(data, all_option_keys)
         file_path = "data/raw/olx_cars.csv"
-        df.to_csv(file_path, index=False)
+        pa_csv.write_csv(table, file_path)
         logger.info(f"[Salvamento] Dados salvos com sucesso em: {file_path}")
-        logger.info(f"[Salvamento] Total de colunas: {len(df.columns)}")
+        logger.info(f"[Salvamento] Total de colunas: {table.num_columns}")
         logger.info(f"[Salvamento] Total de colunas de opcionais: {len(all_option_keys)}")
     except Exception as e:
         logger.error(f"[Salvamento] Erro ao salvar dados: {e}")
@@ -23,6 +23,7 @@ if __name__ == "__main__":
             sys.exit(1)
         
         olx.save_data(car_data)
+        olx.clear_checkpoint()
         
     except Exception as e:
         print(f"Erro durante o scraping: {e}")